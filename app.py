@@ -1,102 +1,900 @@
 # app.py
-from flask import Flask, render_template, jsonify, request
-from scraper.toi_scraper import get_toi_headlines, get_toi_article_text
-from scraper.gnews_scraper import get_gnews_headlines, get_gnews_article_text
-from summarizer.model import summarize_text
-from summarizer.categorizer import categorize_text
-from datetime import datetime, timedelta
+from flask import Flask, render_template, jsonify, request, Response, stream_with_context
+from scraper.toi_scraper import get_toi_article_text
+from scraper.gnews_scraper import get_gnews_article_text
+from scraper.headline_cache import HeadlineStore, HeadlinePrefetcher, HEADLINE_FEEDS
+from scraper.article_jobs import ArticleJobs, TooManyJobs
+from scraper.http_fetcher import ArticleFetchError
+from summarizer import model as summarizer_model
+from summarizer.model import summarize_text, summarize_text_stream, load_model, is_model_loaded
+from summarizer.categorizer import categorize_text, load_classifier, is_classifier_loaded, CLASSIFIER_MODEL_ID
+from summarizer.cache import SummaryCache, make_cache_key, normalize_text
+from summarizer.near_duplicates import (
+    ARTICLE_SIMILARITY_THRESHOLD,
+    minhash_signature,
+    signature_bands,
+    estimate_similarity,
+    signature_to_bytes,
+    signature_from_bytes,
+    cluster_near_duplicates,
+)
+from datetime import datetime
 import os
 import json # --- NEW: Need this to parse coordinates
+import html
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import click
 
 # --- Import the OCR processor ---
 from ocr.ocr_processor import process_image_ocr
+from ocr.tesseract_pool import OcrPoolBusy, OcrJobTimeout
+from ocr.cache import OcrCache
 
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event, inspect
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import undefer, joinedload
+from history_writer import HistoryWriter
+from article_blobs import ARTICLE_CODEC, article_hash, compress_article, decompress_article
 
 basedir = os.path.abspath(os.path.dirname(__file__))
+# OCR workers are spawned processes; when the app is started with
+# `python app.py`, each one re-imports this file as __mp_main__. They
+# must not start the prefetcher or load the models.
+IN_OCR_WORKER = __name__ == '__mp_main__'
 app = Flask(__name__)
 app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(basedir, 'database.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# Uploads bigger than this are rejected before they're read (or decoded)
+MAX_UPLOAD_BYTES = 25 * 1024 * 1024
+app.config['MAX_CONTENT_LENGTH'] = MAX_UPLOAD_BYTES
 db = SQLAlchemy(app)
 
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL lets history pages and search read while the writer commits, and
+    # synchronous=NORMAL is still crash-safe in WAL mode with far fewer fsyncs
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA cache_size=-16000")
+    cursor.close()
+    # The search index reads article text straight out of the compressed blobs
+    dbapi_connection.create_function("decompress_article", 2, decompress_article, deterministic=True)
+
+# Only our own database gets these, not every engine in the process
+with app.app_context():
+    event.listen(db.engine, "connect", set_sqlite_pragmas)
+
+class ArticleBlob(db.Model):
+    """
+    One compressed article body, stored once however many history rows
+    (re-summaries, duplicate submissions) refer to it.
+    """
+    __tablename__ = 'article_blob'
+    # sha256 of the exact article text
+    hash = db.Column(db.String(64), primary_key=True)
+    codec = db.Column(db.String(10), nullable=False)
+    data = db.Column(db.LargeBinary, nullable=False)
+
+    @property
+    def text(self):
+        return decompress_article(self.codec, self.data)
+
+class ArticleSignature(db.Model):
+    """
+    The MinHash signature of an article blob, for finding near-duplicate
+    copies of a story that's already been summarized.
+    """
+    __tablename__ = 'article_signature'
+    article_hash = db.Column(db.String(64), db.ForeignKey('article_blob.hash'), primary_key=True)
+    signature = db.Column(db.LargeBinary, nullable=False)
+
+class ArticleSignatureBand(db.Model):
+    # LSH index: near-duplicate articles share at least one band key
+    __tablename__ = 'article_signature_band'
+    band_key = db.Column(db.BigInteger, primary_key=True)
+    article_hash = db.Column(db.String(64), db.ForeignKey('article_blob.hash'), primary_key=True)
+
 class SummaryHistory(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    source = db.Column(db.String(100), nullable=False)
-    date_saved = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
-    article_text = db.Column(db.Text, nullable=False)
-    summary_text = db.Column(db.Text, nullable=False)
-    category = db.Column(db.String(50), nullable=True)
+    source = db.Column(db.String(100), nullable=False, index=True)
+    date_saved = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+    # The text bodies are only loaded when accessed (or explicitly loaded
+    # up front), so listing history doesn't read every article from disk
+    article_hash = db.Column(db.String(64), db.ForeignKey('article_blob.hash'), nullable=False, index=True)
+    article_blob = db.relationship(ArticleBlob, lazy='select')
+    summary_text = db.deferred(db.Column(db.Text, nullable=False))
+    category = db.Column(db.String(50), nullable=True, index=True)
+
+    # Keyset pagination walks (date_saved, id) newest first
+    __table_args__ = (
+        db.Index('ix_summary_history_date_saved_id', 'date_saved', 'id'),
+    )
+
+    @property
+    def article_text(self):
+        return self.article_blob.text
 
     def __repr__(self):
         return f'<Summary {self.id} - {self.source}>'
 
-cache = {}
+def store_article_blobs(texts):
+    """
+    Adds a compressed blob (and its near-duplicate signature) for each
+    article text not stored yet, in the current transaction, and returns
+    the hash for each text. Only new texts are compressed.
+    """
+    hashes = {text: article_hash(text) for text in texts}
+    existing = set(db.session.scalars(
+        db.select(ArticleBlob.hash).where(ArticleBlob.hash.in_(set(hashes.values())))
+    ))
+    new_texts = {text_hash: text for text, text_hash in hashes.items() if text_hash not in existing}
+    if new_texts:
+        # Another process may have stored the same article meanwhile
+        db.session.execute(sqlite_insert(ArticleBlob).on_conflict_do_nothing(), [
+            {'hash': text_hash, 'codec': ARTICLE_CODEC, 'data': compress_article(text)}
+            for text_hash, text in new_texts.items()
+        ])
+        index_article_signatures(new_texts)
+    return hashes
+
+def index_article_signatures(texts_by_hash):
+    """Adds the MinHash signatures and LSH bands of articles, keyed by hash."""
+    signatures, bands = [], []
+    for text_hash, text in texts_by_hash.items():
+        signature = minhash_signature(text)
+        if signature is None:
+            continue
+        signatures.append({'article_hash': text_hash, 'signature': signature_to_bytes(signature)})
+        bands.extend({'band_key': band_key, 'article_hash': text_hash} for band_key in signature_bands(signature))
+    if signatures:
+        db.session.execute(sqlite_insert(ArticleSignature).on_conflict_do_nothing(), signatures)
+        db.session.execute(sqlite_insert(ArticleSignatureBand).on_conflict_do_nothing(), bands)
+
+def find_near_duplicate_summary(article_text, model_id):
+    """
+    Looks for an article in history that is a near-duplicate of this one
+    (the same story, lightly reworded by another feed) and returns the
+    (summary, category) that `model_id` made of it, or None. Summaries are
+    looked up in the summary cache, so one from another model (or from
+    streaming's greedy decoding) is never reused.
+    """
+    signature = minhash_signature(article_text)
+    if signature is None:
+        return None
+    
+    # Can be called from worker threads, which have no app context of their own
+    with app.app_context():
+        candidates = db.session.scalars(
+            db.select(ArticleSignature)
+            .join(ArticleSignatureBand, ArticleSignatureBand.article_hash == ArticleSignature.article_hash)
+            .where(ArticleSignatureBand.band_key.in_(signature_bands(signature)))
+            .distinct()
+        ).all()
+        scored = [(estimate_similarity(signature, signature_from_bytes(candidate.signature)), candidate.article_hash) for candidate in candidates]
+        scored = [match for match in scored if match[0] >= ARTICLE_SIMILARITY_THRESHOLD]
+        
+        # Most similar first; take the first one this model has summarized
+        for similarity, best_hash in sorted(scored, reverse=True):
+            blob = db.session.get(ArticleBlob, best_hash)
+            known = summary_cache.get(make_cache_key(blob.text, model_id)) if blob else None
+            if known:
+                print(f"--- Found a near-duplicate article in history (similarity {similarity:.2f}). ---")
+                return known
+        return None
+
+def write_history_rows(rows):
+    """
+    Commits a batch of queued history rows, and their search index
+    entries, in one transaction. Runs on the history writer's thread.
+    """
+    with app.app_context():
+        try:
+            hashes = store_article_blobs([row['article_text'] for row in rows])
+            entries = [
+                SummaryHistory(
+                    source=row['source'],
+                    article_hash=hashes[row['article_text']],
+                    summary_text=row['summary_text'],
+                    category=row['category'],
+                    date_saved=row['date_saved']
+                ) for row in rows
+            ]
+            db.session.add_all(entries)
+            # Assigns the ids the search index is keyed on
+            db.session.flush()
+            db.session.execute(
+                db.text("INSERT INTO summary_history_fts (rowid, article_text, summary_text) VALUES (:id, :article_text, :summary_text)"),
+                [
+                    {'id': entry.id, 'article_text': row['article_text'], 'summary_text': row['summary_text']}
+                    for entry, row in zip(entries, rows)
+                ]
+            )
+            db.session.commit()
+            print(f"--- Saved {len(rows)} summaries to database. ---")
+        except Exception:
+            db.session.rollback()
+            raise
+
+# Summaries are saved write-behind: requests queue the row and return,
+# and the writer group-commits whatever has queued up. Anything still
+# queued is written out when the process exits.
+history_writer = HistoryWriter(write_history_rows)
+
+def history_row(source, article_text, summary, category):
+    # Stamped now, so history order follows request order, not commit order
+    return dict(
+        source=source,
+        article_text=article_text,
+        summary_text=summary,
+        category=category,
+        date_saved=datetime.utcnow()
+    )
+
+def save_summary(source, article_text, summary, category):
+    history_writer.add(history_row(source, article_text, summary, category))
+    print(f"--- Queued '{source}' summary for saving. ---")
+
+# Headlines are kept warm by a background prefetcher in a store shared by
+# all workers, so headline requests never wait on an RSS fetch.
+# Set PREFETCH_HEADLINES=0 to skip the background refresh loop.
+headline_prefetcher = HeadlinePrefetcher(HeadlineStore(os.path.join(basedir, 'headlines_cache.db')))
+if os.environ.get('PREFETCH_HEADLINES', '1') != '0' and not IN_OCR_WORKER:
+    headline_prefetcher.start()
+
+# Persistent summary cache, keyed on the article text and the models in use
+summary_cache = SummaryCache(os.path.join(basedir, 'summary_cache.db'))
+# OCR'd column text, keyed by a perceptual hash of the upload and the
+# column's bounds, so re-uploads only re-read columns whose crop changed
+ocr_cache = OcrCache(os.path.join(basedir, 'ocr_cache.db'))
+
+def summary_cache_model_id(streamed=False):
+    # Read at call time: the summarizer's id is only final once it has loaded
+    model_id = f"{summarizer_model.MODEL_ID}|{CLASSIFIER_MODEL_ID}"
+    if streamed:
+        model_id += f"|{summarizer_model.STREAM_DECODING_ID}"
+    return model_id
+
+# --- Model warmup ---
+# The models load lazily on first use. By default we also start loading
+# them in the background right away, so the first summary doesn't pay for
+# it, while headline and history routes are served immediately.
+# Set WARMUP_MODELS=0 to skip this (e.g. for scripts and tests).
+def warm_up_models():
+    try:
+        load_model()
+        load_classifier()
+        print("--- MODELS WARMED UP AND READY ---")
+    except Exception as e:
+        print(f"Error warming up models: {e}")
+
+if os.environ.get('WARMUP_MODELS', '1') != '0' and not IN_OCR_WORKER:
+    threading.Thread(target=warm_up_models, name="model-warmup", daemon=True).start()
 
 @app.route('/')
 def home():
     return render_template('index.html')
 
+# --- History pagination ---
+HISTORY_PAGE_SIZE = 20
+MAX_HISTORY_PAGE_SIZE = 100
+
+def encode_history_cursor(entry):
+    return f"{entry.date_saved.isoformat()}_{entry.id}"
+
+def decode_history_cursor(cursor):
+    date_part, id_part = cursor.rsplit('_', 1)
+    return datetime.fromisoformat(date_part), int(id_part)
+
+def history_page(cursor=None, limit=HISTORY_PAGE_SIZE, category=None, source=None):
+    """
+    Returns one page of history, newest first, and the cursor for the next
+    page (None on the last page). Uses keyset pagination on (date_saved, id),
+    so every page is an index range scan however deep we are.
+    Article bodies are never loaded here.
+    """
+    query = SummaryHistory.query.options(undefer(SummaryHistory.summary_text))
+    if category:
+        query = query.filter(SummaryHistory.category == category)
+    if source:
+        query = query.filter(SummaryHistory.source == source)
+    if cursor:
+        date_saved, entry_id = decode_history_cursor(cursor)
+        query = query.filter(db.or_(
+            SummaryHistory.date_saved < date_saved,
+            db.and_(SummaryHistory.date_saved == date_saved, SummaryHistory.id < entry_id)
+        ))
+    
+    # Fetch one extra row to find out whether there is a next page
+    entries = query.order_by(SummaryHistory.date_saved.desc(), SummaryHistory.id.desc()).limit(limit + 1).all()
+    next_cursor = encode_history_cursor(entries[limit - 1]) if len(entries) > limit else None
+    return entries[:limit], next_cursor
+
+# --- Full-text search ---
+# An FTS5 index over the article and summary text. It's an "external
+# content" table: it stores only the index and reads the text itself
+# through the summary_history_search view, which decompresses article
+# blobs on the fly. New rows are indexed by write_history_rows, in the
+# same transaction, from the text it already has in hand. There are no
+# triggers, so writing to summary_history never needs the app-only
+# decompress_article() function; only searching and rebuilding do.
+SEARCH_INDEX_DDL = [
+    """
+    CREATE VIEW IF NOT EXISTS summary_history_search AS
+    SELECT h.id AS id,
+           decompress_article(b.codec, b.data) AS article_text,
+           h.summary_text AS summary_text
+    FROM summary_history AS h
+    JOIN article_blob AS b ON b.hash = h.article_hash
+    """,
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS summary_history_fts USING fts5(
+        article_text, summary_text,
+        content='summary_history_search', content_rowid='id',
+        tokenize='porter unicode61'
+    )
+    """,
+    # Earlier versions kept the index in sync with triggers that called
+    # decompress_article(), which broke writes from any other connection
+    "DROP TRIGGER IF EXISTS summary_history_fts_insert",
+    "DROP TRIGGER IF EXISTS summary_history_fts_delete",
+    "DROP TRIGGER IF EXISTS summary_history_fts_update",
+]
+# The old search index and triggers read article_text from summary_history
+LEGACY_SEARCH_INDEX_DROPS = [
+    "DROP TRIGGER IF EXISTS summary_history_fts_insert",
+    "DROP TRIGGER IF EXISTS summary_history_fts_delete",
+    "DROP TRIGGER IF EXISTS summary_history_fts_update",
+    "DROP TABLE IF EXISTS summary_history_fts",
+]
+# How many legacy rows are moved into blobs per transaction
+MIGRATION_BATCH_SIZE = 500
+SEARCH_PAGE_SIZE = 20
+# Snippet highlight markers; swapped for <mark> tags after HTML-escaping
+HIGHLIGHT_START = '\x02'
+HIGHLIGHT_END = '\x03'
+
+def init_db():
+    """
+    Creates missing tables, moves article bodies of older databases into
+    compressed blobs, and adds any indexes (and the search index) that
+    older databases don't have yet.
+    """
+    db.create_all()
+    migrated = migrate_article_blobs()
+    backfill_article_signatures()
+    for index in SummaryHistory.__table__.indexes:
+        index.create(db.engine, checkfirst=True)
+    with db.engine.begin() as conn:
+        for statement in SEARCH_INDEX_DDL:
+            conn.exec_driver_sql(statement)
+    if migrated:
+        rebuild_search_index()
+
+def migrate_article_blobs():
+    """
+    Moves the article_text column of an older summary_history table into
+    the article_blob table, storing each distinct article once, then drops
+    the column. Returns False if there was nothing to migrate.
+    Run VACUUM afterwards to give the freed space back to the filesystem.
+    """
+    columns = {column['name'] for column in inspect(db.engine).get_columns('summary_history')}
+    if 'article_text' not in columns:
+        return False
+    
+    print("--- Moving article bodies into compressed blob storage... ---")
+    with db.engine.begin() as conn:
+        # The old search triggers reference article_text, so they have to go first
+        for statement in LEGACY_SEARCH_INDEX_DROPS:
+            conn.exec_driver_sql(statement)
+        if 'article_hash' not in columns:
+            conn.exec_driver_sql("ALTER TABLE summary_history ADD COLUMN article_hash VARCHAR(64)")
+    
+    migrated_rows = 0
+    while True:
+        rows = db.session.execute(db.text(
+            "SELECT id, article_text FROM summary_history WHERE article_hash IS NULL LIMIT :limit"
+        ), {'limit': MIGRATION_BATCH_SIZE}).all()
+        if not rows:
+            break
+        hashes = store_article_blobs([row.article_text for row in rows])
+        db.session.execute(
+            db.text("UPDATE summary_history SET article_hash = :hash WHERE id = :id"),
+            [{'hash': hashes[row.article_text], 'id': row.id} for row in rows]
+        )
+        db.session.commit()
+        migrated_rows += len(rows)
+    
+    with db.engine.begin() as conn:
+        conn.exec_driver_sql("ALTER TABLE summary_history DROP COLUMN article_text")
+    blob_count = db.session.scalar(db.select(db.func.count()).select_from(ArticleBlob))
+    print(f"--- Moved {migrated_rows} article bodies into {blob_count} blobs. ---")
+    return True
+
+def backfill_article_signatures():
+    # Older databases have blobs with no near-duplicate signature yet.
+    # Walks them in hash order, so blobs with no words aren't picked up twice.
+    last_hash = ''
+    while True:
+        blobs = db.session.scalars(
+            db.select(ArticleBlob)
+            .outerjoin(ArticleSignature, ArticleSignature.article_hash == ArticleBlob.hash)
+            .where(ArticleSignature.article_hash.is_(None), ArticleBlob.hash > last_hash)
+            .order_by(ArticleBlob.hash)
+            .limit(MIGRATION_BATCH_SIZE)
+        ).all()
+        if not blobs:
+            return
+        print(f"--- Indexing {len(blobs)} articles for near-duplicate detection... ---")
+        index_article_signatures({blob.hash: blob.text for blob in blobs})
+        db.session.commit()
+        last_hash = blobs[-1].hash
+
+def rebuild_search_index():
+    # Re-reads every row of summary_history into the FTS index
+    with db.engine.begin() as conn:
+        conn.exec_driver_sql("INSERT INTO summary_history_fts (summary_history_fts) VALUES ('rebuild')")
+
+def to_fts_query(user_query):
+    """
+    Turns free text into a safe FTS5 query: every word is quoted (so
+    characters like '-' or ':' aren't parsed as syntax) and all must match.
+    """
+    words = user_query.split()
+    return ' '.join('"' + word.replace('"', '""') + '"' for word in words)
+
+def highlight_snippet(snippet):
+    escaped = html.escape(snippet or '')
+    return escaped.replace(HIGHLIGHT_START, '<mark>').replace(HIGHLIGHT_END, '</mark>')
+
+def search_history(user_query, limit=SEARCH_PAGE_SIZE):
+    """
+    Ranked full-text search over past articles and summaries. Matches in
+    a summary count twice as much as matches in the article.
+    """
+    fts_query = to_fts_query(user_query)
+    if not fts_query:
+        return []
+    
+    rows = db.session.execute(
+        db.text("""
+            SELECT h.id, h.source, h.date_saved, h.category,
+                   snippet(summary_history_fts, 1, :start, :end, '…', 16) AS summary_snippet,
+                   snippet(summary_history_fts, 0, :start, :end, '…', 24) AS article_snippet
+            FROM summary_history_fts
+            JOIN summary_history AS h ON h.id = summary_history_fts.rowid
+            WHERE summary_history_fts MATCH :query
+            ORDER BY bm25(summary_history_fts, 1.0, 2.0)
+            LIMIT :limit
+        """).columns(date_saved=db.DateTime),
+        {'query': fts_query, 'start': HIGHLIGHT_START, 'end': HIGHLIGHT_END, 'limit': limit}
+    )
+    return [{
+        'id': row.id,
+        'source': row.source,
+        # Typed above, so it comes back as a datetime, as in /api/history
+        'date_saved': row.date_saved.isoformat(),
+        'category': row.category,
+        'summary_snippet': highlight_snippet(row.summary_snippet),
+        'article_snippet': highlight_snippet(row.article_snippet)
+    } for row in rows]
+
 @app.route('/history')
 def history():
-    summaries = SummaryHistory.query.order_by(SummaryHistory.date_saved.desc()).all()
-    return render_template('history.html', summaries=summaries)
+    try:
+        summaries, next_cursor = history_page(
+            cursor=request.args.get('cursor'),
+            category=request.args.get('category'),
+            source=request.args.get('source')
+        )
+    except ValueError:
+        return "Invalid history cursor.", 400
+    return render_template('history.html', summaries=summaries, next_cursor=next_cursor)
 
-@app.route('/api/headlines/<publisher>')
-def api_headlines(publisher):
-    global cache
+@app.route('/api/history')
+def api_history():
+    try:
+        limit = min(int(request.args.get('limit', HISTORY_PAGE_SIZE)), MAX_HISTORY_PAGE_SIZE)
+        entries, next_cursor = history_page(
+            cursor=request.args.get('cursor'),
+            limit=max(limit, 1),
+            category=request.args.get('category'),
+            source=request.args.get('source')
+        )
+    except ValueError:
+        return jsonify({'error': 'Invalid cursor or limit.'}), 400
     
-    if publisher in cache and (datetime.now() - cache[publisher].get('timestamp', datetime.min) < timedelta(minutes=10)):
-        print(f"--- RETURNING CACHED {publisher.upper()} HEADLINES ---")
-        return jsonify(cache[publisher]['headlines'])
+    return jsonify({
+        'items': [{
+            'id': entry.id,
+            'source': entry.source,
+            'date_saved': entry.date_saved.isoformat(),
+            'category': entry.category,
+            'summary': entry.summary_text
+        } for entry in entries],
+        'next_cursor': next_cursor
+    })
+
+@app.route('/api/search')
+def api_search():
+    user_query = request.args.get('q', '').strip()
+    if not user_query:
+        return jsonify({'error': "Pass a search query as 'q'."}), 400
+    try:
+        limit = min(max(int(request.args.get('limit', SEARCH_PAGE_SIZE)), 1), MAX_HISTORY_PAGE_SIZE)
+    except ValueError:
+        return jsonify({'error': 'Invalid limit.'}), 400
     
-    print(f"--- FETCHING NEW {publisher.upper()} HEADLINES ---")
-    headlines = []
-    if publisher == 'toi':
-        headlines = get_toi_headlines()
-    elif publisher == 'gnews':
-        headlines = get_gnews_headlines()
+    return jsonify({'query': user_query, 'results': search_history(user_query, limit)})
+
+@app.cli.command('rebuild-search-index')
+def rebuild_search_index_command():
+    """Creates the full-text search index if needed and rebuilds it from all history."""
+    init_db()
+    rebuild_search_index()
+    click.echo("Search index rebuilt.")
+
+@app.cli.command('migrate-article-blobs')
+def migrate_article_blobs_command():
+    """
+    Moves article bodies of an older database into compressed,
+    deduplicated blob storage, then compacts the database file.
+    """
+    database_path = db.engine.url.database
+    size_before = os.path.getsize(database_path)
+    init_db()
+    with db.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.exec_driver_sql("VACUUM")
+        conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+    size_after = os.path.getsize(database_path)
+    click.echo(f"database.db: {size_before / 1e6:.1f} MB -> {size_after / 1e6:.1f} MB")
+
+@app.route('/api/history/<int:entry_id>')
+def api_history_entry(entry_id):
+    entry = db.session.get(SummaryHistory, entry_id, options=[joinedload(SummaryHistory.article_blob), undefer(SummaryHistory.summary_text)])
+    if entry is None:
+        return jsonify({'error': 'No such history entry.'}), 404
+    return jsonify({
+        'id': entry.id,
+        'source': entry.source,
+        'date_saved': entry.date_saved.isoformat(),
+        'category': entry.category,
+        'summary': entry.summary_text,
+        'article_text': entry.article_text
+    })
+
+@app.route('/api/ready')
+def api_ready():
+    models = {
+        'summarizer': is_model_loaded(),
+        'classifier': is_classifier_loaded()
+    }
+    ready = all(models.values())
+    return jsonify({'ready': ready, 'models': models}), (200 if ready else 503)
+
+def cluster_headlines(publisher, headlines):
+    """
+    Lists, under 'duplicates', the other headlines that tell the same story
+    as each of this feed's headlines: from the other feeds' cached
+    headlines as well as this one. Every headline is still listed itself.
+    """
+    entries = [(publisher, headline) for headline in headlines]
+    entries += [(feed, headline) for feed in HEADLINE_FEEDS if feed != publisher
+                for headline in headline_prefetcher.cached(feed)]
+    clusters = cluster_near_duplicates([headline['headline'] for _, headline in entries])
+    members = {}
+    for index, cluster in enumerate(clusters):
+        members.setdefault(cluster, []).append(index)
+    return [
+        dict(headline, duplicates=[
+            dict(entries[other][1], feed=entries[other][0])
+            for other in members[clusters[index]] if other != index
+        ])
+        for index, headline in enumerate(headlines)
+    ]
+
+@app.route('/api/headlines/<publisher>')
+def api_headlines(publisher):
+    if publisher not in HEADLINE_FEEDS:
+        return jsonify([])
     
-    cache[publisher] = {'headlines': headlines, 'timestamp': datetime.now()}
-    return jsonify(headlines)
+    headlines, pending = headline_prefetcher.get(publisher)
+    response = jsonify(cluster_headlines(publisher, headlines))
+    if pending:
+        # Nothing cached yet; the first fetch is running in the background
+        response.headers['X-Headlines-Pending'] = '1'
+    return response
+
+def sse_event(event, data):
+    # Formats one Server-Sent Event
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def fetch_article(url):
+    # Raises ArticleFetchError if the article can't be fetched
+    if "timesofindia.indiatimes.com" in url:
+        return get_toi_article_text(url)
+    return get_gnews_article_text(url)
+
+# Slow article fetches run here, off the request threads; job state is
+# shared by all workers, so polls can land on any of them
+article_jobs = ArticleJobs(fetch_article, os.path.join(basedir, 'article_jobs.db'))
 
 @app.route('/api/get_article', methods=['POST'])
 def api_get_article():
     data = request.get_json()
     url = data['url']
-    text = "Error: Unknown news source"
-    
-    if "timesofindia.indiatimes.com" in url:
-        text = get_toi_article_text(url)
-    else:
-        text = get_gnews_article_text(url)
+    try:
+        text = fetch_article(url)
+    except ArticleFetchError as e:
+        return jsonify({'error': str(e)}), 502
     
     return jsonify({'article_text': text})
 
+# --- Job-based article fetching ---
+# POST returns a job id right away; the client then polls the job,
+# or subscribes to its Server-Sent Events stream, until it is done.
+@app.route('/api/get_article/jobs', methods=['POST'])
+def api_create_article_job():
+    data = request.get_json()
+    try:
+        job_id = article_jobs.submit(data['url'])
+    except TooManyJobs as e:
+        return jsonify({'error': str(e)}), 503
+    return jsonify({'job_id': job_id}), 202
+
+@app.route('/api/get_article/jobs/<job_id>')
+def api_article_job(job_id):
+    job = article_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown or expired job.'}), 404
+    return jsonify(job)
+
+@app.route('/api/get_article/jobs/<job_id>/events')
+def api_article_job_events(job_id):
+    def generate():
+        last_status = None
+        while True:
+            job = article_jobs.wait_for_change(job_id, last_status, timeout=15)
+            if job is None:
+                yield sse_event('error', {'error': 'Unknown or expired job.'})
+                return
+            if job['status'] == last_status:
+                # Keep the connection alive while the fetch is still running
+                yield ": keep-alive\n\n"
+                continue
+            last_status = job['status']
+            yield sse_event('status', job)
+            if last_status in ('done', 'error'):
+                return
+    
+    return Response(generate(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
+def lookup_summary(article_text, model_id):
+    """
+    Returns (summary, category) for an article `model_id` has already
+    summarized: the same text from the summary cache, or a near-duplicate
+    copy of the story from history. Returns None for a new article.
+    """
+    cache_key = make_cache_key(article_text, model_id)
+    cached = summary_cache.get(cache_key)
+    if cached:
+        print("--- RETURNING CACHED SUMMARY ---")
+        return cached
+    
+    near_duplicate = find_near_duplicate_summary(article_text, model_id)
+    if near_duplicate:
+        print("--- REUSING SUMMARY OF A NEAR-DUPLICATE ARTICLE ---")
+        summary_cache.put(cache_key, *near_duplicate)
+        return near_duplicate
+    return None
+
+def summarize_and_categorize(article_text):
+    """
+    Returns (summary, category) for an article, reusing an earlier
+    summary of the same (or nearly the same) article if there is one.
+    """
+    model_id = summary_cache_model_id()
+    known = lookup_summary(article_text, model_id)
+    if known:
+        return known
+    
+    summary = summarize_text(article_text)
+    category = categorize_text(summary)
+    summary_cache.put(make_cache_key(article_text, model_id), summary, category)
+    return summary, category
+
 @app.route('/api/summarize', methods=['POST'])
 def api_summarize():
     data = request.get_json()
     article_text = data['text']
     source = data.get('source', 'Online Article') 
     
-    summary = summarize_text(article_text)
-    category = categorize_text(summary)
+    summary, category = summarize_and_categorize(article_text)
     
-    try:
-        new_entry = SummaryHistory(
-            source=source,
-            article_text=article_text,
-            summary_text=summary,
-            category=category
-        )
-        db.session.add(new_entry)
-        db.session.commit()
-        print(f"--- Saved '{source}' summary to database. ---")
-    except Exception as e:
-        print(f"Error saving to database: {e}")
-        db.session.rollback()
+    save_summary(source, article_text, summary, category)
     
     return jsonify({'summary': summary, 'category': category})
 
+# --- Streaming summaries ---
+# Same work as /api/summarize, but sent as Server-Sent Events: a 'progress'
+# event per chunk, 'token' events for the final summary as it's generated,
+# and a 'done' event with the summary and category.
+@app.route('/api/summarize/stream', methods=['POST'])
+def api_summarize_stream():
+    data = request.get_json()
+    article_text = data['text']
+    source = data.get('source', 'Online Article')
+    
+    def generate():
+        # A beam-search summary from /api/summarize is welcome here, but our
+        # own greedy one is kept apart, so /api/summarize never serves it
+        model_id = summary_cache_model_id(streamed=True)
+        cache_key = make_cache_key(article_text, model_id)
+        known = lookup_summary(article_text, summary_cache_model_id()) or lookup_summary(article_text, model_id)
+        if known:
+            summary, category = known
+        else:
+            summary = ""
+            try:
+                for event in summarize_text_stream(article_text):
+                    if event['event'] == 'summary':
+                        summary = event['summary']
+                    else:
+                        yield sse_event(event['event'], event)
+            except Exception as e:
+                print(f"An error occurred while streaming a summary: {e}")
+                yield sse_event('error', {'error': f'An error occurred while summarizing: {e}'})
+                return
+            category = categorize_text(summary)
+            summary_cache.put(cache_key, summary, category)
+        
+        save_summary(source, article_text, summary, category)
+        yield sse_event('done', {'summary': summary, 'category': category})
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
+# --- Bulk summarization ---
+# How many articles one batch request may contain
+MAX_BATCH_ITEMS = 100
+# How many articles we fetch, and summarize, at the same time. Concurrent
+# summaries share the model's micro-batches through the batch scheduler.
+BATCH_FETCH_WORKERS = 4
+BATCH_SUMMARIZE_WORKERS = 8
+
+def batch_item_error(article):
+    """Returns why a batch item can't be summarized, or None if it looks fine."""
+    if not isinstance(article, dict) or not (article.get('text') or article.get('url')):
+        return "Each article needs a 'text' or a 'url'."
+    for field in ('text', 'url', 'source'):
+        if article.get(field) is not None and not isinstance(article[field], str):
+            return f"The article's '{field}' must be a string."
+    return None
+
+def summarize_batch(articles, default_source='Batch Summary'):
+    """
+    Summarizes many articles at once. Each article is a dict with either
+    'text' or 'url', and optionally 'source' (default_source otherwise). Duplicate URLs and texts are
+    only fetched and summarized once. Returns one result per article, in
+    order, each with either 'summary' and 'category' or an 'error'.
+    """
+    results = [{'index': i} for i in range(len(articles))]
+    
+    # 1. Dedupe the URLs and fetch them concurrently
+    urls = []
+    for i, article in enumerate(articles):
+        error = batch_item_error(article)
+        if error:
+            results[i]['error'] = error
+        elif not article.get('text') and article['url'] not in urls:
+            urls.append(article['url'])
+    
+    def fetch_one(url):
+        try:
+            return fetch_article(url), None
+        except ArticleFetchError as e:
+            return None, str(e)
+        except Exception as e:
+            print(f"An error occurred while fetching a batch item: {e}")
+            return None, f"An error occurred while fetching the article: {e}"
+    
+    print(f"--- BATCH: fetching {len(urls)} unique URLs ---")
+    with ThreadPoolExecutor(max_workers=BATCH_FETCH_WORKERS) as executor:
+        fetched = dict(zip(urls, executor.map(fetch_one, urls)))
+    
+    # 2. Work out each article's text, and dedupe the texts
+    texts = {}
+    for i, article in enumerate(articles):
+        if 'error' in results[i]:
+            continue
+        if article.get('url'):
+            results[i]['url'] = article['url']
+        text = article.get('text')
+        if not text:
+            text, error = fetched[article['url']]
+            if error:
+                results[i]['error'] = error
+                continue
+        text_key = normalize_text(text)
+        texts.setdefault(text_key, text)
+        results[i]['text_key'] = text_key
+    
+    # 3. Summarize the unique texts concurrently, so their chunks share batches
+    def summarize_one(text):
+        try:
+            return summarize_and_categorize(text), None
+        except Exception as e:
+            print(f"An error occurred while summarizing a batch item: {e}")
+            return None, f"An error occurred while summarizing: {e}"
+    
+    print(f"--- BATCH: summarizing {len(texts)} unique articles ---")
+    with ThreadPoolExecutor(max_workers=BATCH_SUMMARIZE_WORKERS) as executor:
+        summaries = dict(zip(texts, executor.map(summarize_one, texts.values())))
+    
+    # 4. Fill in the results and queue each unique article once for saving
+    new_entries = []
+    saved_keys = set()
+    for i, article in enumerate(articles):
+        text_key = results[i].pop('text_key', None)
+        if text_key is None:
+            continue
+        summary_and_category, error = summaries[text_key]
+        if error:
+            results[i]['error'] = error
+            continue
+        summary, category = summary_and_category
+        results[i].update({'summary': summary, 'category': category})
+        if text_key in saved_keys:
+            continue
+        saved_keys.add(text_key)
+        new_entries.append(history_row(article.get('source') or default_source, texts[text_key], summary, category))
+    
+    history_writer.add_all(new_entries)
+    print(f"--- BATCH: queued {len(new_entries)} summaries for saving. ---")
+    
+    return results
+
+@app.route('/api/summarize/batch', methods=['POST'])
+def api_summarize_batch():
+    data = request.get_json()
+    articles = (data or {}).get('articles')
+    if not isinstance(articles, list) or not articles:
+        return jsonify({'error': "Send a non-empty 'articles' list."}), 400
+    if len(articles) > MAX_BATCH_ITEMS:
+        return jsonify({'error': f'A batch can hold at most {MAX_BATCH_ITEMS} articles.'}), 400
+    
+    return jsonify({'results': summarize_batch(articles)})
+
+@app.cli.command('summarize-batch')
+@click.argument('input_file', type=click.File('r'))
+@click.option('--source', default='Batch Summary', help='Source name saved with each summary.')
+def summarize_batch_command(input_file, source):
+    """
+    Summarizes every URL (one per line) in INPUT_FILE, or every article
+    in a JSON list of {"text"|"url", "source"} objects, and prints the
+    results as JSON. Use - to read from stdin. --source names every
+    article that doesn't carry its own.
+    """
+    content = input_file.read()
+    try:
+        articles = json.loads(content)
+    except ValueError:
+        articles = [{'url': line.strip()} for line in content.splitlines() if line.strip()]
+    if not isinstance(articles, list):
+        raise click.BadParameter("The JSON input must be a list of articles.", param_hint='INPUT_FILE')
+    
+    init_db()
+    results = summarize_batch(articles, default_source=source)
+    # Wait for the queued summaries to be written before we report
+    history_writer.close()
+    click.echo(json.dumps(results, indent=2))
+
+@app.errorhandler(413)
+def request_too_large(e):
+    return jsonify({'error': f'The upload is too large. Files can be at most {MAX_UPLOAD_BYTES // (1024 * 1024)} MB.'}), 413
+
 # --- NEW: HUMAN-IN-THE-LOOP OCR ENDPOINT ---
 @app.route('/api/ocr-summarize-manual', methods=['POST'])
 def api_ocr_summarize_manual():
@@ -111,37 +909,22 @@ def api_ocr_summarize_manual():
         
     try:
         # Get the gap coordinates from the user
-        gaps = json.loads(gaps_json)
+        gaps = json.loads(gaps_json or "[]")
         print(f"--- RUNNING MANUAL OCR with gaps at: {gaps} ---")
         
         # 1. Get the text, passing the user-defined gaps
-        extracted_text = process_image_ocr(file, gaps)
+        extracted_text = process_image_ocr(file, gaps, cache=ocr_cache)
         
         if "Could not" in extracted_text or "Error" in extracted_text:
              return jsonify({'error': extracted_text}), 400
         
-        # 2. Summarize the extracted text
+        # 2. Summarize and categorize the extracted text (cached, so an
+        # unchanged re-upload skips the models entirely)
         print("--- SUMMARIZING OCR TEXT ---")
-        summary = summarize_text(extracted_text)
-        
-        # 3. Categorize the summary
-        print("--- CATEGORIZING OCR TEXT ---")
-        category = categorize_text(summary)
+        summary, category = summarize_and_categorize(extracted_text)
         
-        # 4. Save to database
-        try:
-            new_entry = SummaryHistory(
-                source="OCR Upload (Manual)", # New source
-                article_text=extracted_text,
-                summary_text=summary,
-                category=category
-            )
-            db.session.add(new_entry)
-            db.session.commit()
-            print("--- Saved 'OCR Upload (Manual)' summary to database. ---")
-        except Exception as e:
-            print(f"Error saving to database: {e}")
-            db.session.rollback()
+        # 3. Save to database
+        save_summary("OCR Upload (Manual)", extracted_text, summary, category)
 
         return jsonify({
             'extracted_text': extracted_text,
@@ -149,11 +932,15 @@ def api_ocr_summarize_manual():
             'category': category
         })
         
+    except OcrPoolBusy as e:
+        return jsonify({'error': str(e)}), 503
+    except OcrJobTimeout as e:
+        return jsonify({'error': f'Reading the image took too long. {e}'}), 504
     except Exception as e:
         print(f"An error occurred in api_ocr_summarize_manual: {e}")
         return jsonify({'error': f'An internal server error occurred: {e}'}), 500
 
 if __name__ == '__main__':
     with app.app_context():
-        db.create_all()
+        init_db()
     app.run(debug=True)
\ No newline at end of file
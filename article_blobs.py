@@ -0,0 +1,37 @@
+# article_blobs.py
+
+import hashlib
+import zlib
+
+# zstd compresses news text better and decompresses faster than zlib.
+# It's optional: without the zstandard package new blobs use zlib.
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+CODEC_ZLIB = "zlib"
+CODEC_ZSTD = "zstd"
+# The codec new article blobs are written with
+ARTICLE_CODEC = CODEC_ZSTD if zstandard is not None else CODEC_ZLIB
+ZLIB_LEVEL = 9
+ZSTD_LEVEL = 12
+
+def article_hash(text):
+    """The content address of an article body: sha256 of its exact text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def compress_article(text, codec=ARTICLE_CODEC):
+    data = text.encode("utf-8")
+    if codec == CODEC_ZSTD:
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return zlib.compress(data, ZLIB_LEVEL)
+
+def decompress_article(codec, data):
+    if data is None:
+        return None
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("This article was compressed with zstd. Install the zstandard package to read it.")
+        return zstandard.ZstdDecompressor().decompress(data).decode("utf-8")
+    return zlib.decompress(data).decode("utf-8")
@@ -0,0 +1,84 @@
+import sys
+from datasets import Dataset
+import evaluate
+from transformers import AutoTokenizer
+from optimum.onnxruntime import ORTModelForSeq2SeqLM, ORTModelForSequenceClassification
+
+from summarizer.backends import (
+    BACKEND_PYTORCH,
+    BACKEND_INT8,
+    BACKEND_ONNX,
+    load_seq2seq_model,
+    onnx_model_dir,
+    classifier_onnx_dir,
+)
+from summarizer.categorizer import CLASSIFIER_MODEL
+from prepare_data import DATA_FILE, read_cleaned_data
+
+# --- 1. Configuration ---
+MODEL_DIR = "./my-fine-tuned-model"
+# Must match train_summarizer.py, so we evaluate on the same held-out split
+SPLIT_SEED = 42
+TEST_SIZE = 0.1
+# How many held-out articles to score (the whole split is slow on CPU)
+EVAL_SAMPLES = 100
+# How far ROUGE-L may drop below fp32 PyTorch before we reject a backend
+ROUGE_TOLERANCE = 0.01
+MAX_INPUT_LENGTH = 512
+prefix = "summarize: "
+
+# --- 2. Export the models to ONNX ---
+print(f"Exporting {MODEL_DIR} to ONNX...")
+ORTModelForSeq2SeqLM.from_pretrained(MODEL_DIR, export=True).save_pretrained(onnx_model_dir(MODEL_DIR))
+AutoTokenizer.from_pretrained(MODEL_DIR).save_pretrained(onnx_model_dir(MODEL_DIR))
+print(f"Saved ONNX summarizer to {onnx_model_dir(MODEL_DIR)}")
+
+print(f"Exporting {CLASSIFIER_MODEL} to ONNX...")
+ORTModelForSequenceClassification.from_pretrained(CLASSIFIER_MODEL, export=True).save_pretrained(classifier_onnx_dir(CLASSIFIER_MODEL))
+AutoTokenizer.from_pretrained(CLASSIFIER_MODEL).save_pretrained(classifier_onnx_dir(CLASSIFIER_MODEL))
+print(f"Saved ONNX classifier to {classifier_onnx_dir(CLASSIFIER_MODEL)}")
+
+# --- 3. Load the held-out split ---
+print("Loading held-out split...")
+df = read_cleaned_data(DATA_FILE)
+df = df.dropna()
+eval_dataset = Dataset.from_pandas(df).train_test_split(test_size=TEST_SIZE, seed=SPLIT_SEED)['test']
+eval_dataset = eval_dataset.select(range(min(EVAL_SAMPLES, len(eval_dataset))))
+print(f"Scoring {len(eval_dataset)} held-out articles per backend.")
+
+tokenizer = AutoTokenizer.from_pretrained(MODEL_DIR)
+rouge = evaluate.load("rouge")
+
+def score_backend(backend):
+    model = load_seq2seq_model(MODEL_DIR, backend)
+    task_params = (model.config.task_specific_params or {}).get('summarization', {})
+    predictions = []
+    for article in eval_dataset['article']:
+        inputs = tokenizer(prefix + article, max_length=MAX_INPUT_LENGTH, truncation=True, return_tensors="pt")
+        output = model.generate(
+            **inputs,
+            min_length=40,
+            max_new_tokens=150,
+            do_sample=False,
+            num_beams=task_params.get('num_beams', 1),
+        )
+        predictions.append(tokenizer.decode(output[0], skip_special_tokens=True))
+    return rouge.compute(predictions=predictions, references=eval_dataset['summary'])['rougeL']
+
+# --- 4. Check ROUGE against the fp32 baseline ---
+baseline = score_backend(BACKEND_PYTORCH)
+print(f"{BACKEND_PYTORCH}: ROUGE-L = {baseline:.4f}")
+
+failed = []
+for backend in (BACKEND_INT8, BACKEND_ONNX):
+    score = score_backend(backend)
+    drop = baseline - score
+    status = "OK" if drop <= ROUGE_TOLERANCE else "TOO LOW"
+    print(f"{backend}: ROUGE-L = {score:.4f} (drop {drop:+.4f}) {status}")
+    if drop > ROUGE_TOLERANCE:
+        failed.append(backend)
+
+if failed:
+    print(f"ROUGE-L dropped by more than {ROUGE_TOLERANCE} for: {', '.join(failed)}. Don't use these backends.")
+    sys.exit(1)
+print("All backends are within tolerance. Set INFERENCE_BACKEND to int8 or onnx to use them.")
@@ -0,0 +1,88 @@
+# history_writer.py
+
+import atexit
+import queue
+import threading
+
+# Most rows we commit in one transaction
+MAX_WRITE_BATCH = 200
+# How long the writer waits for more rows before committing what it has
+WRITE_BATCH_WAIT_SECONDS = 0.05
+
+_STOP = object()
+
+
+class HistoryWriter:
+    """
+    A write-behind queue for history rows. Request threads just enqueue a
+    row and return; one background thread drains the queue and commits the
+    rows in groups, so requests never wait on an SQLite transaction or
+    fsync, and never fight each other for the database write lock.
+
+    `write_batch(rows)` is called on the writer thread with a list of rows
+    and must commit them in a single transaction, or roll it back and
+    raise. If a batch fails, its rows are retried one at a time, so one
+    bad row doesn't lose the rest.
+    """
+
+    def __init__(self, write_batch, max_batch=MAX_WRITE_BATCH, batch_wait=WRITE_BATCH_WAIT_SECONDS):
+        self.write_batch = write_batch
+        self.max_batch = max_batch
+        self.batch_wait = batch_wait
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="history-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def add(self, row):
+        self._queue.put(row)
+
+    def add_all(self, rows):
+        for row in rows:
+            self._queue.put(row)
+
+    def _run(self):
+        while True:
+            rows = [self._queue.get()]
+            stopping = rows[0] is _STOP
+            if stopping:
+                rows = []
+
+            # Collect whatever else arrives shortly, up to one batch
+            while not stopping and len(rows) < self.max_batch:
+                try:
+                    row = self._queue.get(timeout=self.batch_wait)
+                except queue.Empty:
+                    break
+                if row is _STOP:
+                    stopping = True
+                    break
+                rows.append(row)
+
+            if rows:
+                self._write(rows)
+
+            if stopping:
+                return
+
+    def _write(self, rows):
+        try:
+            self.write_batch(rows)
+            return
+        except Exception as e:
+            if len(rows) == 1:
+                print(f"Error saving a history row to database: {e}")
+                return
+            print(f"Error saving {len(rows)} history rows to database: {e}. Retrying them one at a time.")
+
+        for row in rows:
+            try:
+                self.write_batch([row])
+            except Exception as e:
+                print(f"Error saving a history row to database: {e}")
+
+    def close(self, timeout=10):
+        """Writes out everything still queued, then stops the writer."""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
@@ -0,0 +1,170 @@
+# ocr/cache.py
+
+import hashlib
+import sqlite3
+import threading
+import time
+import cv2
+import numpy as np
+
+# How many column texts we keep before evicting the least recently used ones
+MAX_CACHE_ENTRIES = 2000
+# The difference hash compares HASH_SIZE x HASH_SIZE neighbouring cells,
+# so it's HASH_SIZE ** 2 bits. Large enough that two different pages
+# with the same layout still hash differently.
+HASH_SIZE = 32
+# Re-encoding a photo flips a few hash bits; different pages differ in
+# hundreds. Hashes closer than this count as the same image.
+MAX_HASH_DISTANCE = 32
+
+
+def perceptual_hash(image):
+    """
+    A difference hash (dHash) of a grayscale image, as hex. Re-encoding
+    or brightening the same photo or screenshot changes only a few bits.
+    """
+    small = cv2.resize(image, (HASH_SIZE + 1, HASH_SIZE), interpolation=cv2.INTER_AREA)
+    bits = small[:, 1:] > small[:, :-1]
+    return np.packbits(bits).tobytes().hex()
+
+
+def hash_distance(page_hash, other_hash):
+    """How many bits two perceptual hashes differ in."""
+    return bin(int(page_hash, 16) ^ int(other_hash, 16)).count('1')
+
+
+def make_ocr_cache_key(page_hash, page_shape, column_bounds, ocr_settings):
+    """
+    Keys one column's text by the page it came from, where the column
+    was cut, and how it was OCR'd. Moving one gap only changes the keys
+    of the columns next to it.
+    """
+    digest = hashlib.sha256()
+    digest.update(page_hash.encode('utf-8'))
+    digest.update(repr((tuple(page_shape), tuple(column_bounds), ocr_settings)).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class OcrCache:
+    """
+    A persistent, size-bounded LRU cache of OCR'd column text stored in a
+    sidecar SQLite file, so it survives restarts and is shared by every
+    worker process.
+    """
+
+    def __init__(self, db_path, max_entries=MAX_CACHE_ENTRIES):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS ocr_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    column_text TEXT NOT NULL,
+                    last_used REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_ocr_cache_last_used ON ocr_cache (last_used)"
+            )
+            # Every page we've seen, so near-identical re-uploads can be
+            # matched to the hash their columns were cached under
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS ocr_page (
+                    page_hash TEXT PRIMARY KEY,
+                    width INTEGER NOT NULL,
+                    height INTEGER NOT NULL,
+                    last_used REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_ocr_page_size ON ocr_page (width, height)"
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    def match_page(self, page_hash, page_shape):
+        """
+        Returns the hash an earlier upload of the same image (same size,
+        perceptual hash within MAX_HASH_DISTANCE) was stored under, or
+        records this one as a new page and returns it unchanged.
+        """
+        height, width = page_shape[:2]
+        try:
+            with self._lock, self._connect() as conn:
+                candidates = conn.execute(
+                    "SELECT page_hash FROM ocr_page WHERE width = ? AND height = ?",
+                    (width, height)
+                ).fetchall()
+                matches = [(hash_distance(page_hash, row[0]), row[0]) for row in candidates]
+                matches = [match for match in matches if match[0] <= MAX_HASH_DISTANCE]
+                if matches:
+                    page_hash = min(matches)[1]
+                conn.execute(
+                    "INSERT OR REPLACE INTO ocr_page (page_hash, width, height, last_used) VALUES (?, ?, ?, ?)",
+                    (page_hash, width, height, time.time())
+                )
+                conn.execute(
+                    """
+                    DELETE FROM ocr_page WHERE page_hash IN (
+                        SELECT page_hash FROM ocr_page
+                        ORDER BY last_used DESC
+                        LIMIT -1 OFFSET ?
+                    )
+                    """,
+                    (self.max_entries,)
+                )
+        except sqlite3.Error as e:
+            print(f"Error reading from OCR cache: {e}")
+        return page_hash
+
+    def get(self, cache_key):
+        """
+        Returns the cached text of a column, or None on a miss.
+        A hit also refreshes the entry's position in the LRU order.
+        """
+        try:
+            with self._lock, self._connect() as conn:
+                row = conn.execute(
+                    "SELECT column_text FROM ocr_cache WHERE cache_key = ?",
+                    (cache_key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                conn.execute(
+                    "UPDATE ocr_cache SET last_used = ? WHERE cache_key = ?",
+                    (time.time(), cache_key)
+                )
+                return row[0]
+        except sqlite3.Error as e:
+            print(f"Error reading from OCR cache: {e}")
+            return None
+
+    def put(self, cache_key, column_text):
+        """
+        Stores a column's text and evicts the least recently used entries
+        once the cache grows past max_entries.
+        """
+        try:
+            with self._lock, self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO ocr_cache (cache_key, column_text, last_used) VALUES (?, ?, ?)",
+                    (cache_key, column_text, time.time())
+                )
+                conn.execute(
+                    """
+                    DELETE FROM ocr_cache WHERE cache_key IN (
+                        SELECT cache_key FROM ocr_cache
+                        ORDER BY last_used DESC
+                        LIMIT -1 OFFSET ?
+                    )
+                    """,
+                    (self.max_entries,)
+                )
+        except sqlite3.Error as e:
+            print(f"Error writing to OCR cache: {e}")
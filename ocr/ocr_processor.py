@@ -1,26 +1,161 @@
 # ocr/ocr_processor.py (The CORRECT version)
 
-import pytesseract
 from PIL import Image
-import os
+import atexit
+import io
 import cv2
 import numpy as np
 import pandas as pd
+from ocr.cache import perceptual_hash, make_ocr_cache_key
+from ocr.tesseract_pool import TesseractPool, OcrPoolBusy, OcrJobTimeout, TESSERACT_CONFIG
 
-# --- TESSERACT PATH ---
-try:
-    pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
-except Exception:
-    print("Tesseract not found. Hoping it's in the system PATH.")
+# --- Column OCR settings ---
+# Slivers narrower than this (e.g. two clicks on the same gutter) are skipped
+MIN_COLUMN_WIDTH = 40
+# We only correct small rotations; anything bigger is probably a misreading
+MAX_DESKEW_DEGREES = 10
 
-def process_image_ocr(image_file, gaps): # gaps will be unused
+# --- Upload decoding settings ---
+# Refuse images bigger than this before decoding them (~50 MP)
+MAX_IMAGE_PIXELS = 50_000_000
+# Tesseract reads body text best at around 300 DPI; phone photos of a
+# newspaper are usually far denser, which only costs time and memory
+TARGET_DPI = 300
+# Used when the image has no usable DPI, e.g. phone photos claiming 72 DPI
+MAX_OCR_DIMENSION = 3500
+# EXIF orientations that turn the image a quarter turn
+EXIF_ORIENTATION_TAG = 274
+ROTATED_ORIENTATIONS = {5, 6, 7, 8}
+# JPEG can be decoded straight at 1/2, 1/4 or 1/8 scale, which is much
+# cheaper than decoding at full size and shrinking afterwards
+REDUCED_DECODE_FLAGS = {
+    8: cv2.IMREAD_REDUCED_GRAYSCALE_8,
+    4: cv2.IMREAD_REDUCED_GRAYSCALE_4,
+    2: cv2.IMREAD_REDUCED_GRAYSCALE_2,
+}
+
+def column_bounds(width, gaps):
+    """
+    The (left, right) x-range of each column between the user's gap
+    x-coordinates, left to right. With no gaps the whole page is one column.
+    """
+    edges = sorted({min(max(int(round(x)), 0), width) for x in (gaps or [])} | {0, width})
+    return [(left, right) for left, right in zip(edges, edges[1:]) if right - left >= MIN_COLUMN_WIDTH]
+
+def split_columns(image, gaps):
+    """Cuts a grayscale page into column crops at the user's gaps, left to right."""
+    return [image[:, left:right] for left, right in column_bounds(image.shape[1], gaps)]
+
+def deskew(image):
+    """
+    Straightens slightly rotated text, measured from the angle
+    of the smallest rectangle around all the dark pixels.
+    """
+    _, ink = cv2.threshold(image, 0, 255, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU)
+    coords = cv2.findNonZero(ink)
+    if coords is None:
+        return image
+    # OpenCV versions disagree on minAreaRect's angle range, but a
+    # rectangle's angle only matters modulo 90, so map it into [-45, 45)
+    angle = (cv2.minAreaRect(coords)[-1] + 45) % 90 - 45
+    if abs(angle) < 0.1 or abs(angle) > MAX_DESKEW_DEGREES:
+        return image
+    height, width = image.shape
+    rotation = cv2.getRotationMatrix2D((width / 2, height / 2), angle, 1.0)
+    return cv2.warpAffine(image, rotation, (width, height), flags=cv2.INTER_CUBIC, borderMode=cv2.BORDER_REPLICATE)
+
+def binarize(image):
+    # A light blur first, so paper grain doesn't turn into speckles
+    blurred = cv2.GaussianBlur(image, (3, 3), 0)
+    _, binary = cv2.threshold(blurred, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+    return binary
+
+def prepare_column(column):
+    """Cleans up one column crop for Tesseract. Runs in an OCR worker process."""
+    return binarize(deskew(column))
+
+# The single pool of long-lived OCR workers; columns are read in parallel
+ocr_pool = TesseractPool(prepare=prepare_column)
+atexit.register(ocr_pool.shutdown)
+
+def ocr_scale(width, height, dpi):
+    """
+    How much to shrink an image for OCR: down to TARGET_DPI when the image
+    says what its DPI is, otherwise to MAX_OCR_DIMENSION on its long side.
+    Never enlarges.
+    """
+    # Anything claiming less than 150 DPI is a default, not a measurement
+    if dpi and dpi >= 150:
+        return min(1.0, TARGET_DPI / dpi)
+    return min(1.0, MAX_OCR_DIMENSION / max(width, height))
+
+def decode_for_ocr(data):
+    """
+    Decodes an uploaded image straight into a grayscale numpy array at OCR
+    resolution. The header is checked against MAX_IMAGE_PIXELS before
+    anything is decoded. Returns (page, scale), where scale maps original
+    image coordinates (like the user's gaps) onto the page.
+    """
+    try:
+        # Image.open only reads the header here
+        with Image.open(io.BytesIO(data)) as header:
+            width, height = header.size
+            dpi = header.info.get('dpi', (0, 0))[0]
+            # imdecode applies the EXIF rotation (as browsers do, so the
+            # gaps match it), so a rotated photo comes out the other way round
+            if header.getexif().get(EXIF_ORIENTATION_TAG) in ROTATED_ORIENTATIONS:
+                width, height = height, width
+    except Exception:
+        raise ValueError("Could not read the uploaded file as an image.") from None
+    if width * height > MAX_IMAGE_PIXELS:
+        raise ValueError(f"The image is {width}x{height}; images can have at most {MAX_IMAGE_PIXELS // 1_000_000} MP.")
+
+    scale = ocr_scale(width, height, float(dpi or 0))
+    # Decode at the biggest reduction that doesn't go below the target size
+    flag = next((flag for factor, flag in REDUCED_DECODE_FLAGS.items() if 1 / factor >= scale), cv2.IMREAD_GRAYSCALE)
+    # np.frombuffer wraps the upload's bytes without copying them
+    page = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), flag)
+    if page is None:
+        raise ValueError("Could not decode the uploaded image.")
+
+    target_size = (max(1, round(width * scale)), max(1, round(height * scale)))
+    if (page.shape[1], page.shape[0]) != target_size:
+        page = cv2.resize(page, target_size, interpolation=cv2.INTER_AREA)
+    print(f"--- Decoded {width}x{height} image for OCR at {target_size[0]}x{target_size[1]} ---")
+    return page, scale
+
+def process_image_ocr(image_file, gaps, cache=None):
+    """
+    OCRs each column of the page and joins them in reading order.
+    With an OcrCache, columns already read from the same image (matched
+    by perceptual hash) with the same bounds are taken from the cache, so
+    moving one gap only re-reads the columns next to it.
+    Raises OcrPoolBusy or OcrJobTimeout when the OCR workers are
+    overloaded; other failures are returned as an "Error: ..." message.
+    """
     try:
-        pil_image = Image.open(image_file).convert('L')
+        page, scale = decode_for_ocr(image_file.read())
+        # The gaps were marked on the full-size image
+        bounds = column_bounds(page.shape[1], [x * scale for x in (gaps or [])])
+        texts = [None] * len(bounds)
+        if cache is not None:
+            page_hash = cache.match_page(perceptual_hash(page), page.shape)
+            keys = [make_ocr_cache_key(page_hash, page.shape, bound, TESSERACT_CONFIG) for bound in bounds]
+            texts = [cache.get(key) for key in keys]
 
-        # This is the "broken" part - just running tesseract on the whole image
-        print("--- RUNNING FAILED AUTO-OCR (FOR SCREENSHOT) ---")
-        text = pytesseract.image_to_string(pil_image) 
+        missing = [i for i, text in enumerate(texts) if text is None]
+        print(f"--- RUNNING OCR ON {len(missing)} OF {len(bounds)} COLUMN(S) ---")
+        columns = [page[:, bounds[i][0]:bounds[i][1]] for i in missing]
+        # map() returns results in column order, whatever order they finish in
+        for i, text in zip(missing, ocr_pool.map(columns)):
+            text = text.strip()
+            texts[i] = text
+            if cache is not None:
+                cache.put(keys[i], text)
 
-        return text
+        return "\n\n".join(text for text in texts if text)
+    except (OcrPoolBusy, OcrJobTimeout):
+        # Not the image's fault; the caller reports these as retryable
+        raise
     except Exception as e:
-        return f"Error: {e}"
\ No newline at end of file
+        return f"Error: {e}"
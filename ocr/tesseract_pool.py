@@ -0,0 +1,233 @@
+# ocr/tesseract_pool.py
+
+import multiprocessing
+import os
+import queue
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+# tesserocr is optional (see "Faster OCR" in the README). It binds the
+# Tesseract library directly, so a worker loads the language data once
+# and keeps it. Without it, workers fall back to running the tesseract
+# CLI for every image, which reloads the language data each time.
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+# --- TESSERACT PATH ---
+TESSERACT_CMD = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
+# Where tesserocr finds the language data; None uses its built-in default
+TESSDATA_PATH = None
+if os.path.exists(TESSERACT_CMD):
+    TESSDATA_PATH = os.path.join(os.path.dirname(TESSERACT_CMD), 'tessdata')
+else:
+    print("Tesseract not found. Hoping it's in the system PATH.")
+    TESSERACT_CMD = 'tesseract'
+
+# "Assume a single column of text of variable sizes"
+TESSERACT_PSM = 4
+TESSERACT_CONFIG = f'--psm {TESSERACT_PSM}'
+
+# --- Pool settings ---
+# Long-lived OCR worker processes; each reads one image at a time
+MAX_OCR_WORKERS = max(1, min(4, os.cpu_count() or 1))
+# Beyond this many queued or running images, new ones are turned away
+MAX_PENDING_IMAGES = MAX_OCR_WORKERS * 8
+# A worker that takes longer than this on one image is killed and replaced
+JOB_TIMEOUT_SECONDS = 120
+
+
+class OcrPoolBusy(Exception):
+    """Raised when the OCR queue is full."""
+
+
+class OcrJobTimeout(Exception):
+    """Raised when an image wasn't read within the job timeout."""
+
+
+def run_tesseract(image):
+    """
+    Sends a grayscale image to the tesseract CLI over stdin as an
+    in-memory PGM and reads the text from stdout, with no temp files.
+    """
+    ok, pgm = cv2.imencode('.pgm', image)
+    if not ok:
+        raise RuntimeError("Could not encode the image for tesseract.")
+    try:
+        result = subprocess.run(
+            [TESSERACT_CMD, 'stdin', 'stdout', *TESSERACT_CONFIG.split()],
+            input=pgm.tobytes(),
+            capture_output=True,
+            timeout=JOB_TIMEOUT_SECONDS
+        )
+    except FileNotFoundError:
+        raise RuntimeError(f"{TESSERACT_CMD} is not installed or it's not in your PATH.") from None
+    except subprocess.TimeoutExpired:
+        raise RuntimeError(f"Tesseract took longer than {JOB_TIMEOUT_SECONDS} seconds.") from None
+    if result.returncode != 0:
+        raise RuntimeError(f"Tesseract failed: {result.stderr.decode('utf-8', 'replace').strip()}")
+    return result.stdout.decode('utf-8', 'replace')
+
+
+def _worker_main(conn, prepare):
+    """
+    Runs in each worker process: reads images from the pipe until it gets
+    None, sending back ('ok', text) or ('error', message) for each one.
+    """
+    # Each worker already reads one image; don't let tesseract
+    # start extra OpenMP threads on top of that
+    os.environ['OMP_THREAD_LIMIT'] = '1'
+
+    api = None
+    if tesserocr is not None:
+        # Loads the traineddata once, for every image this worker reads
+        if TESSDATA_PATH:
+            api = tesserocr.PyTessBaseAPI(path=TESSDATA_PATH, psm=TESSERACT_PSM)
+        else:
+            api = tesserocr.PyTessBaseAPI(psm=TESSERACT_PSM)
+
+    try:
+        while True:
+            image = conn.recv()
+            if image is None:
+                break
+            try:
+                if prepare is not None:
+                    image = prepare(image)
+                if api is not None:
+                    image = np.ascontiguousarray(image)
+                    height, width = image.shape
+                    api.SetImageBytes(image.tobytes(), width, height, 1, width)
+                    text = api.GetUTF8Text()
+                else:
+                    text = run_tesseract(image)
+                conn.send(('ok', text))
+            except Exception as e:
+                conn.send(('error', str(e)))
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        if api is not None:
+            api.End()
+
+
+class _Worker:
+    def __init__(self, context, prepare):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn, prepare), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+            self.process.join(1)
+        except Exception:
+            pass
+        if self.process.is_alive():
+            self.process.kill()
+        self.conn.close()
+
+    def kill(self):
+        self.process.kill()
+        self.process.join(1)
+        self.conn.close()
+
+
+class TesseractPool:
+    """
+    A fixed pool of long-lived OCR worker processes. Each worker pays
+    Tesseract's startup cost (and, with tesserocr, loading the language
+    data) once, instead of once per column.
+
+    `prepare(image)`, if given, runs in the worker before OCR (e.g. deskew
+    and binarize). Workers are spawned, not forked, so it must be a
+    module-level function that the workers can import.
+    """
+
+    def __init__(self, prepare=None, max_workers=MAX_OCR_WORKERS,
+                 max_pending=MAX_PENDING_IMAGES, job_timeout=JOB_TIMEOUT_SECONDS):
+        self.prepare = prepare
+        self.max_workers = max_workers
+        self.job_timeout = job_timeout
+        # Bounds how many images are queued or being read at once
+        self._pending = threading.BoundedSemaphore(max_pending)
+        self._idle = queue.Queue()
+        self._started = False
+        self._start_lock = threading.Lock()
+        # Forking a process that already runs threads (Flask, torch) can
+        # deadlock the child, so workers are always started fresh
+        self._context = multiprocessing.get_context("spawn")
+        # Waits on the workers' pipes so one call can read several images at once
+        self._dispatcher = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ocr-dispatch")
+
+    def _start(self):
+        # Workers are started on first use, not at import time
+        with self._start_lock:
+            if not self._started:
+                print(f"--- STARTING {self.max_workers} OCR WORKERS ({'tesserocr' if tesserocr else 'tesseract CLI'}) ---")
+                if tesserocr is None:
+                    print("tesserocr is not installed, so every column starts a new tesseract process. See \"Faster OCR\" in the README.")
+                for _ in range(self.max_workers):
+                    self._idle.put(_Worker(self._context, self.prepare))
+                self._started = True
+
+    def _read(self, image):
+        try:
+            worker = self._idle.get(timeout=self.job_timeout)
+        except queue.Empty:
+            raise OcrJobTimeout(f"No OCR worker became free within {self.job_timeout} seconds.") from None
+
+        try:
+            worker.conn.send(image)
+            if not worker.conn.poll(self.job_timeout):
+                raise OcrJobTimeout(f"OCR took longer than {self.job_timeout} seconds.")
+            status, result = worker.conn.recv()
+        except Exception:
+            # A stuck or dead worker is replaced, so the pool keeps its size
+            worker.kill()
+            self._idle.put(_Worker(self._context, self.prepare))
+            raise
+        self._idle.put(worker)
+
+        if status == 'error':
+            raise RuntimeError(result)
+        return result
+
+    def read(self, image):
+        """
+        Reads the text of one grayscale image (a numpy array).
+        Raises OcrPoolBusy if the queue is full.
+        """
+        return self.map([image])[0]
+
+    def map(self, images):
+        """
+        Reads several images in parallel and returns their texts in order.
+        Raises OcrPoolBusy if the queue can't take all of them.
+        """
+        self._start()
+        acquired = 0
+        try:
+            for _ in images:
+                if not self._pending.acquire(blocking=False):
+                    raise OcrPoolBusy("The OCR queue is full. Please try again in a moment.")
+                acquired += 1
+            return list(self._dispatcher.map(self._read, images))
+        finally:
+            for _ in range(acquired):
+                self._pending.release()
+
+    def shutdown(self):
+        """Stops every idle worker. ocr_processor registers this to run at exit."""
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            worker.stop()
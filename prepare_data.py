@@ -1,14 +1,29 @@
-import pandas as pd
+import argparse
+import csv
 import os
 import re
-import matplotlib.pyplot as plt
-import seaborn as sns
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
 
 # Define the paths to your dataset
 DATA_DIR = "BBC News Summary"
 ARTICLES_DIR = os.path.join(DATA_DIR, "News Articles")
 SUMMARIES_DIR = os.path.join(DATA_DIR, "Summaries")
 CATEGORIES = ["business", "entertainment", "politics", "sport", "tech"]
+OUTPUT_FILE = "bbc_news_cleaned.csv"
+# The cleaned data the training scripts read: a .csv or .parquet file.
+# Set DATA_FILE to use another one, e.g. DATA_FILE=bbc_news_cleaned.parquet
+DATA_FILE = os.environ.get('DATA_FILE', OUTPUT_FILE)
+# Files are read and cleaned in batches of this size, one batch per task
+FILES_PER_TASK = 256
+# Rows are written out in groups of this size (a Parquet row group)
+WRITE_BATCH_ROWS = 10_000
+# Batches submitted per worker ahead of the one being written, so reading
+# can't run far ahead of writing and pile finished batches up in memory
+TASKS_IN_FLIGHT_PER_WORKER = 2
+COLUMNS = ['article', 'summary', 'category']
 
 def clean_text(text):
     """
@@ -22,90 +37,175 @@ def clean_text(text):
     # You could add more complex cleaning here if needed
     return text
 
-def load_data():
+def word_count(cleaned_text):
+    # Cleaned text has exactly one space between words
+    return cleaned_text.count(' ') + 1 if cleaned_text else 0
+
+def read_text(path):
+    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+        return f.read()
+
+def read_cleaned_data(path=DATA_FILE):
+    """Reads the cleaned dataset back, from CSV or (for a .parquet path) Parquet."""
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+def list_tasks():
     """
-    Loads articles and summaries from the folders into a pandas DataFrame.
+    Splits the dataset into (category, file names) batches,
+    in a stable order so the output is the same on every run.
     """
-    data = []
-    
-    print("Loading data from folders...")
-    
+    tasks = []
     for category in CATEGORIES:
-        article_path = os.path.join(ARTICLES_DIR, category)
-        summary_path = os.path.join(SUMMARIES_DIR, category)
-        
-        # Get all file names
-        files = os.listdir(article_path)
-        
-        for file_name in files:
-            # Read the article
-            with open(os.path.join(article_path, file_name), 'r', encoding='utf-8', errors='ignore') as f:
-                article = f.read()
-                
-            # Read the summary
-            with open(os.path.join(summary_path, file_name), 'r', encoding='utf-8', errors='ignore') as f:
-                summary = f.read()
-                
-            data.append({
-                'category': category,
-                'article': clean_text(article),
-                'summary': clean_text(summary)
-            })
-            
-    print(f"Loaded {len(data)} article/summary pairs.")
-    return pd.DataFrame(data)
-
-def perform_eda(df):
+        files = sorted(os.listdir(os.path.join(ARTICLES_DIR, category)))
+        for start in range(0, len(files), FILES_PER_TASK):
+            tasks.append((category, files[start:start + FILES_PER_TASK]))
+    return tasks
+
+def load_batch(task):
+    """
+    Reads and cleans one batch of article/summary pairs. Runs in a worker
+    process. Returns the rows with their word counts, so the lengths come
+    out of the same pass as the cleaning.
+    """
+    category, file_names = task
+    rows = []
+    for file_name in file_names:
+        article = clean_text(read_text(os.path.join(ARTICLES_DIR, category, file_name)))
+        summary = clean_text(read_text(os.path.join(SUMMARIES_DIR, category, file_name)))
+        rows.append((article, summary, category, word_count(article), word_count(summary)))
+    return rows
+
+class CsvRowWriter:
+    def __init__(self, path):
+        self._file = open(path, 'w', encoding='utf-8', newline='')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(COLUMNS)
+
+    def write(self, rows):
+        self._writer.writerows(rows)
+
+    def close(self):
+        self._file.close()
+
+class ParquetRowWriter:
+    def __init__(self, path):
+        # pyarrow is only needed for Parquet output
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        self._pa = pa
+        self._schema = pa.schema([(column, pa.string()) for column in COLUMNS])
+        self._writer = pq.ParquetWriter(path, self._schema)
+
+    def write(self, rows):
+        columns = list(zip(*rows))
+        self._writer.write_table(self._pa.Table.from_arrays([self._pa.array(list(column)) for column in columns], schema=self._schema))
+
+    def close(self):
+        self._writer.close()
+
+def prepare_data(output_path=OUTPUT_FILE, workers=None):
     """
-    Performs and displays Exploratory Data Analysis (EDA).
+    Loads, cleans and writes every article/summary pair, streaming rows to
+    CSV (or Parquet, for a .parquet path) as worker processes finish each
+    batch, so the corpus is never held in memory. Returns a DataFrame of
+    just the word counts.
     """
+    tasks = iter(list_tasks())
+    writer = ParquetRowWriter(output_path) if output_path.endswith('.parquet') else CsvRowWriter(output_path)
+    article_lengths, summary_lengths = array('l'), array('l')
+    pending = []
+    workers = workers or os.cpu_count() or 1
+
+    print(f"Loading data from folders with {workers} workers...")
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # Futures are consumed in submission order, so the batches come
+            # out in order whichever worker finishes first. Only a few are
+            # submitted ahead, so memory stays bounded however big the corpus.
+            in_flight = deque()
+            while True:
+                while len(in_flight) < workers * TASKS_IN_FLIGHT_PER_WORKER:
+                    task = next(tasks, None)
+                    if task is None:
+                        break
+                    in_flight.append(executor.submit(load_batch, task))
+                if not in_flight:
+                    break
+                for article, summary, category, article_length, summary_length in in_flight.popleft().result():
+                    pending.append((article, summary, category))
+                    article_lengths.append(article_length)
+                    summary_lengths.append(summary_length)
+                if len(pending) >= WRITE_BATCH_ROWS:
+                    writer.write(pending)
+                    pending = []
+            if pending:
+                writer.write(pending)
+    finally:
+        writer.close()
+
+    print(f"Loaded {len(article_lengths)} article/summary pairs.")
+    return pd.DataFrame({'article_length': article_lengths, 'summary_length': summary_lengths})
+
+def perform_eda(lengths):
+    """
+    Performs and displays Exploratory Data Analysis (EDA) on the word
+    counts collected while loading.
+    """
+    # Plotting libraries are slow to import and only needed here
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
     print("\n--- EDA: Data Analysis ---")
-    
-    # 1. Check for null values
-    print("Checking for null values:")
-    print(df.isnull().sum())
+
+    # 1. Check for empty texts
+    print("Checking for empty texts:")
+    print((lengths == 0).sum())
 
     # 2. Analyze text lengths
-    df['article_length'] = df['article'].apply(lambda x: len(x.split()))
-    df['summary_length'] = df['summary'].apply(lambda x: len(x.split()))
-    
     print("\nText Length Statistics (in words):")
-    print(df[['article_length', 'summary_length']].describe())
-    
+    print(lengths.describe())
+
     # 3. Plot histograms of text lengths
     print("Generating length distribution plots...")
-    
+
     plt.figure(figsize=(12, 6))
-    
+
     # Article length histogram
     plt.subplot(1, 2, 1)
-    sns.histplot(df['article_length'], bins=50, kde=True)
+    sns.histplot(lengths['article_length'], bins=50, kde=True)
     plt.title('Article Length Distribution')
     plt.xlabel('Number of Words')
     plt.ylabel('Frequency')
-    
+
     # Summary length histogram
     plt.subplot(1, 2, 2)
-    sns.histplot(df['summary_length'], bins=30, kde=True)
+    sns.histplot(lengths['summary_length'], bins=30, kde=True)
     plt.title('Summary Length Distribution')
     plt.xlabel('Number of Words')
-    
+
     plt.suptitle('EDA: Text Length Analysis')
     plt.savefig('length_analysis.png')
     print("Saved length analysis plot to 'length_analysis.png'")
 
 # --- Main execution ---
 if __name__ == "__main__":
-    # 1. Load and clean data
-    dataframe = load_data()
-    
-    # 2. Perform EDA
-    perform_eda(dataframe)
-    
-    # 3. Save the clean data to a single CSV file
-    # We drop the length columns as they were just for analysis
-    clean_df = dataframe[['article', 'summary', 'category']]
-    clean_df.to_csv('bbc_news_cleaned.csv', index=False)
-    
+    parser = argparse.ArgumentParser(description="Cleans the BBC News Summary dataset into one file.")
+    parser.add_argument('--output', default=DATA_FILE, help="CSV file to write, or a .parquet file (needs pyarrow). The training scripts read DATA_FILE.")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: one per CPU).")
+    parser.add_argument('--eda', action='store_true', help="Also print length statistics and plot their distributions.")
+    args = parser.parse_args()
+
+    # 1. Load, clean and save the data in one pass
+    lengths = prepare_data(args.output, args.workers)
+
+    # 2. Perform EDA, only if asked for
+    if args.eda:
+        perform_eda(lengths)
+    else:
+        print("\nText Length Statistics (in words):")
+        print(lengths.describe())
+
     print("\n--- Preprocessing Complete ---")
-    print("Cleaned data saved to 'bbc_news_cleaned.csv'")
\ No newline at end of file
+    print(f"Cleaned data saved to '{args.output}'")
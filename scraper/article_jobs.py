@@ -0,0 +1,130 @@
+# scraper/article_jobs.py
+
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+# At most this many article fetches run at once
+MAX_FETCH_WORKERS = 4
+# Beyond this many queued or running jobs, new ones are turned away
+MAX_PENDING_JOBS = 50
+# Finished (done or failed) jobs are forgotten this long after finishing.
+# Queued and running jobs are never expired, however long they wait.
+JOB_TTL_SECONDS = 10 * 60
+# How often a waiter re-reads a job that another worker process is running
+POLL_INTERVAL_SECONDS = 0.5
+
+JOB_FIELDS = ('status', 'url', 'article_text', 'error')
+
+
+class TooManyJobs(Exception):
+    """Raised when the fetch queue is full."""
+
+
+class ArticleJobs:
+    """
+    Runs slow article fetches on a bounded executor so they don't tie up
+    request threads. Callers get a job id right away and check back later
+    (by polling, or by waiting on the job for a streamed response).
+
+    Jobs are kept in a sidecar SQLite file, so a poll that lands on a
+    different worker process than the one running the fetch still finds it.
+    """
+
+    def __init__(self, fetch_article, db_path, max_workers=MAX_FETCH_WORKERS):
+        self.fetch_article = fetch_article
+        self.db_path = db_path
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="article-fetch")
+        # Wakes waiters in this process as soon as one of its own jobs changes
+        self._changed = threading.Condition()
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS article_jobs (
+                    job_id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    article_text TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    finished_at REAL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_article_jobs_status ON article_jobs (status)"
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    def submit(self, url):
+        """Queues a fetch and returns its job id. Raises TooManyJobs if full."""
+        now = time.time()
+        job_id = uuid.uuid4().hex
+        with self._connect() as conn:
+            conn.execute(
+                "DELETE FROM article_jobs WHERE status IN ('done', 'error') AND finished_at < ?",
+                (now - JOB_TTL_SECONDS,)
+            )
+            active = conn.execute(
+                "SELECT COUNT(*) FROM article_jobs WHERE status IN ('pending', 'running')"
+            ).fetchone()[0]
+            if active >= MAX_PENDING_JOBS:
+                raise TooManyJobs("Too many article fetches are already queued. Please try again shortly.")
+            conn.execute(
+                "INSERT INTO article_jobs (job_id, status, url, created_at) VALUES (?, 'pending', ?, ?)",
+                (job_id, url, now)
+            )
+        self._executor.submit(self._run, job_id, url)
+        return job_id
+
+    def _update(self, job_id, **changes):
+        columns = ", ".join(f"{column} = ?" for column in changes)
+        with self._connect() as conn:
+            conn.execute(
+                f"UPDATE article_jobs SET {columns} WHERE job_id = ?",
+                (*changes.values(), job_id)
+            )
+        with self._changed:
+            self._changed.notify_all()
+
+    def _run(self, job_id, url):
+        try:
+            self._update(job_id, status='running')
+            text = self.fetch_article(url)
+            self._update(job_id, status='done', article_text=text, finished_at=time.time())
+        except Exception as e:
+            print(f"An error occurred in article fetch job {job_id}: {e}")
+            try:
+                self._update(job_id, status='error', error=str(e), finished_at=time.time())
+            except sqlite3.Error as e:
+                print(f"Could not record the failure of article fetch job {job_id}: {e}")
+
+    def get(self, job_id):
+        """Returns a snapshot of the job, or None if it's unknown or expired."""
+        with self._connect() as conn:
+            row = conn.execute(
+                f"SELECT {', '.join(JOB_FIELDS)} FROM article_jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(JOB_FIELDS, row))
+
+    def wait_for_change(self, job_id, last_status, timeout):
+        """
+        Blocks until the job's status differs from `last_status` (or the
+        timeout passes), then returns the current snapshot.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self.get(job_id)
+            remaining = deadline - time.monotonic()
+            if job is None or job['status'] != last_status or remaining <= 0:
+                return job
+            # Another process may be running the job, so don't rely on
+            # being notified; look again at least every POLL_INTERVAL_SECONDS
+            with self._changed:
+                self._changed.wait(min(remaining, POLL_INTERVAL_SECONDS))
@@ -0,0 +1,157 @@
+# scraper/driver_pool.py
+
+import atexit
+import queue
+import threading
+from contextlib import contextmanager
+
+from selenium import webdriver
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.chrome.service import Service as ChromeService
+from webdriver_manager.chrome import ChromeDriverManager
+
+# --- Pool settings ---
+# At most this many headless Chrome instances run at once
+MAX_DRIVERS = 3
+# A driver is recycled (quit and replaced) after serving this many pages
+MAX_PAGES_PER_DRIVER = 50
+# How long a scraper waits for a free driver before giving up
+CHECKOUT_TIMEOUT_SECONDS = 30
+PAGE_LOAD_TIMEOUT_SECONDS = 60
+
+
+class DriverPoolTimeout(Exception):
+    """Raised when no WebDriver became free within the checkout timeout."""
+
+
+class DriverPool:
+    """
+    A shared, bounded pool of warm headless Chrome sessions.
+
+    Scrapers check a driver out with `with driver_pool.driver() as driver:`
+    instead of launching and quitting Chrome for every article. Drivers are
+    health-checked on checkout, reset on return, and recycled after
+    `max_pages` pages so a long-lived browser can't leak memory forever.
+    """
+
+    def __init__(self, max_drivers=MAX_DRIVERS, max_pages=MAX_PAGES_PER_DRIVER,
+                 checkout_timeout=CHECKOUT_TIMEOUT_SECONDS):
+        self.max_pages = max_pages
+        self.checkout_timeout = checkout_timeout
+        # Bounds how many drivers exist (idle + checked out) at any time
+        self._slots = threading.BoundedSemaphore(max_drivers)
+        # Idle drivers as (driver, pages_served); LIFO keeps the warmest one hot
+        self._idle = queue.LifoQueue()
+        self._service_path = None
+        self._service_lock = threading.Lock()
+
+    def _get_service(self):
+        # Resolve (and, if needed, download) chromedriver only once per process
+        with self._service_lock:
+            if self._service_path is None:
+                self._service_path = ChromeDriverManager().install()
+        return ChromeService(self._service_path)
+
+    def _create_driver(self):
+        print("--- STARTING NEW HEADLESS CHROME FOR THE DRIVER POOL ---")
+        options = webdriver.ChromeOptions()
+        options.add_argument('--headless')
+        options.add_argument('--no-sandbox')
+        options.add_argument('--disable-dev-shm-usage')
+        options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
+        options.add_experimental_option("excludeSwitches", ["enable-automation"])
+        options.add_experimental_option('useAutomationExtension', False)
+
+        driver = webdriver.Chrome(service=self._get_service(), options=options)
+        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT_SECONDS)
+        return driver
+
+    @staticmethod
+    def _is_healthy(driver):
+        try:
+            # Any round trip to the browser will do; a dead session raises
+            driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _quit(driver):
+        try:
+            driver.quit()
+        except Exception as e:
+            print(f"Error while quitting a pooled driver: {e}")
+
+    def _reset(self, driver):
+        # Stop any page still loading and clear state left by the last site
+        driver.execute_script("window.stop();")
+        driver.delete_all_cookies()
+        driver.get("about:blank")
+
+    @contextmanager
+    def driver(self, timeout=None):
+        """
+        Checks out a healthy driver, creating one if the pool has room.
+        Raises DriverPoolTimeout if none is free within the timeout.
+        """
+        timeout = self.checkout_timeout if timeout is None else timeout
+        if not self._slots.acquire(timeout=timeout):
+            raise DriverPoolTimeout(f"No browser became free within {timeout} seconds.")
+
+        driver, pages = None, 0
+        try:
+            while True:
+                try:
+                    driver, pages = self._idle.get_nowait()
+                except queue.Empty:
+                    driver, pages = self._create_driver(), 0
+                    break
+                if self._is_healthy(driver):
+                    break
+                print("Discarding an unhealthy pooled driver.")
+                self._quit(driver)
+                driver = None
+        except Exception:
+            self._slots.release()
+            raise
+
+        broken = False
+        try:
+            yield driver
+        except TimeoutException:
+            # A slow page or a missing element; the browser itself is fine
+            raise
+        except Exception:
+            broken = True
+            raise
+        finally:
+            pages += 1
+            self._checkin(driver, pages, broken)
+            self._slots.release()
+
+    def _checkin(self, driver, pages, broken):
+        if broken or pages >= self.max_pages:
+            self._quit(driver)
+            return
+        try:
+            self._reset(driver)
+        except Exception as e:
+            print(f"Could not reset pooled driver, discarding it: {e}")
+            self._quit(driver)
+            return
+        self._idle.put((driver, pages))
+
+    def shutdown(self):
+        """Quits every idle driver. Called automatically at exit."""
+        while True:
+            try:
+                driver, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._quit(driver)
+
+
+# The single pool shared by every scraper in this package
+driver_pool = DriverPool()
+atexit.register(driver_pool.shutdown)
@@ -0,0 +1,41 @@
+# scraper/feeds.py
+
+import threading
+
+import feedparser
+
+# Per feed URL: the ETag / Last-Modified validators from the last full
+# download, and the entries we parsed from it
+_feed_cache = {}
+_lock = threading.Lock()
+
+
+def parse_feed(url):
+    """
+    Fetches and parses an RSS feed with a conditional GET.
+
+    We send back the validators from the last download. If the server
+    answers 304 Not Modified, nothing is downloaded or parsed and we
+    return the entries we already have.
+    """
+    with _lock:
+        cached = _feed_cache.get(url)
+
+    if cached:
+        feed = feedparser.parse(url, etag=cached['etag'], modified=cached['modified'])
+    else:
+        feed = feedparser.parse(url)
+
+    if getattr(feed, 'status', None) == 304 and cached:
+        print(f"Feed not modified since last fetch: {url}")
+        return cached['entries']
+
+    # Only remember a successful download, so a failed one doesn't wipe the validators
+    if feed.entries:
+        with _lock:
+            _feed_cache[url] = {
+                'etag': feed.get('etag'),
+                'modified': feed.get('modified'),
+                'entries': feed.entries,
+            }
+    return feed.entries
@@ -1,14 +1,13 @@
 # scraper/gnews_scraper.py
 
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service as ChromeService
-from webdriver_manager.chrome import ChromeDriverManager
 from bs4 import BeautifulSoup
 from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
-import feedparser
+from scraper.driver_pool import driver_pool
+from scraper.feeds import parse_feed
+from scraper.http_fetcher import fetch_article_text
 
 def get_gnews_headlines():
     """
@@ -21,8 +20,8 @@ def get_gnews_headlines():
     
     headlines = []
     try:
-        feed = feedparser.parse(url)
-        for entry in feed.entries:
+        entries = parse_feed(url)
+        for entry in entries:
             headlines.append({
                 'headline': entry.title,
                 'url': entry.link
@@ -36,52 +35,10 @@ def get_gnews_headlines():
     return headlines[:30]
 
 
-def get_gnews_article_text(url):
+def _extract_generic_text(html_content):
     """
-    Uses our most robust, generic Selenium scraper to fetch article text
-    from any link provided by the Google News feed.
+    Generic extraction that works on most news sites, or returns None.
     """
-    print(f"--- FETCHING GENERIC ARTICLE TEXT WITH SELENIUM FROM: {url} ---")
-    options = webdriver.ChromeOptions()
-    options.add_argument('--headless')
-    options.add_argument('--no-sandbox')
-    options.add_argument('--disable-dev-shm-usage')
-    options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
-    options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    options.add_experimental_option('useAutomationExtension', False)
-    
-    driver = None
-    try:
-        service = ChromeService(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=options)
-        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-        driver.set_page_load_timeout(60)
-
-        try:
-            driver.get(url)
-        except TimeoutException:
-            print("Page load for article timed out.")
-            driver.quit()
-            return "Could not load the article page in time. It may be blocking requests."
-
-        # Wait for the body tag to be present
-        WebDriverWait(driver, 20).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-        
-        # This is a special step for Google News links: wait for the redirect
-        if "google.com" in driver.current_url:
-            print("Waiting for Google redirect...")
-            WebDriverWait(driver, 60).until(lambda d: "google.com" not in d.current_url)
-            print(f"Redirect complete. Final URL: {driver.current_url}")
-        
-        html_content = driver.page_source
-        
-    except Exception as e:
-        print(f"An error occurred with Selenium while fetching the article: {e}")
-        return "This website is actively blocking scraping attempts. Please try another article."
-    finally:
-        if driver:
-            driver.quit()
-
     soup = BeautifulSoup(html_content, 'html.parser')
     
     # --- Generic Scraper Fallback Logic ---
@@ -103,4 +60,50 @@ def get_gnews_article_text(url):
         if len(article_text) > 300: # Make sure it's real content
             return article_text
 
-    return "Found the page, but could not find the main article content. The layout is unrecognized."
\ No newline at end of file
+    return None
+
+
+def _render_generic_page(url):
+    """
+    Renders any page with a pooled Selenium driver, following the
+    Google News JavaScript redirect when there is one.
+    Returns (html, None), or (None, error_message) on failure.
+    """
+    print(f"--- FETCHING GENERIC ARTICLE TEXT WITH SELENIUM FROM: {url} ---")
+    try:
+        with driver_pool.driver() as driver:
+            try:
+                driver.get(url)
+            except TimeoutException:
+                print("Page load for article timed out.")
+                return None, "Could not load the article page in time. It may be blocking requests."
+
+            # Wait for the body tag to be present
+            WebDriverWait(driver, 20).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
+        
+            # This is a special step for Google News links: wait for the redirect
+            if "google.com" in driver.current_url:
+                print("Waiting for Google redirect...")
+                WebDriverWait(driver, 60).until(lambda d: "google.com" not in d.current_url)
+                print(f"Redirect complete. Final URL: {driver.current_url}")
+        
+            return driver.page_source, None
+        
+    except Exception as e:
+        print(f"An error occurred with Selenium while fetching the article: {e}")
+        return None, "This website is actively blocking scraping attempts. Please try another article."
+
+
+def get_gnews_article_text(url):
+    """
+    Uses our most robust, generic scraper to fetch article text from any
+    link provided by the Google News feed. Direct links are tried with a
+    plain HTTP GET first; Google redirect links go straight to Selenium.
+    """
+    print(f"--- FETCHING GENERIC ARTICLE TEXT FROM: {url} ---")
+    return fetch_article_text(
+        url,
+        _extract_generic_text,
+        _render_generic_page,
+        "Found the page, but could not find the main article content. The layout is unrecognized."
+    )
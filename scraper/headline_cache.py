@@ -0,0 +1,218 @@
+# scraper/headline_cache.py
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+from scraper.toi_scraper import get_toi_headlines
+from scraper.gnews_scraper import get_gnews_headlines
+from scraper.reuters_scraper import get_reuters_headlines
+from scraper.news_scraper import get_headlines, NEWS_CATEGORIES
+
+# --- Refresh timing ---
+# Headlines older than this are refreshed in the background, ahead of expiry
+REFRESH_AFTER_SECONDS = 8 * 60
+# Headlines older than this are stale: still served, but refreshed right away
+STALE_AFTER_SECONDS = 10 * 60
+# How often the prefetcher wakes up to look for feeds that need a refresh
+PREFETCH_INTERVAL_SECONDS = 30
+# How long one worker may hold a feed's refresh lease before others take over
+REFRESH_LEASE_SECONDS = 60
+# After a failed fetch, wait this long before trying the feed again
+RETRY_FAILED_AFTER_SECONDS = 60
+
+# Every feed the prefetcher keeps warm, by the name used in /api/headlines/<name>
+HEADLINE_FEEDS = {
+    'toi': get_toi_headlines,
+    'gnews': get_gnews_headlines,
+    'reuters': get_reuters_headlines,
+}
+for _category in NEWS_CATEGORIES:
+    HEADLINE_FEEDS[f'news-{_category}'] = lambda category=_category: get_headlines(category)
+
+
+class HeadlineStore:
+    """
+    Keeps the latest headlines for every feed in a sidecar SQLite file, so
+    all worker processes share one copy. It also holds a per-feed refresh
+    lease, so only one worker refetches a feed at a time.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS headline_cache (
+                    feed TEXT PRIMARY KEY,
+                    headlines TEXT,
+                    fetched_at REAL,
+                    lease_owner TEXT,
+                    lease_until REAL NOT NULL DEFAULT 0,
+                    failed_at REAL
+                )
+                """
+            )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(headline_cache)")}
+            if 'failed_at' not in columns:
+                conn.execute("ALTER TABLE headline_cache ADD COLUMN failed_at REAL")
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    def get(self, feed):
+        """
+        Returns (headlines, fetched_at, failed_at). headlines and fetched_at
+        are None if the feed was never fetched; failed_at is the time of the
+        last failed fetch, or None.
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT headlines, fetched_at, failed_at FROM headline_cache WHERE feed = ?", (feed,)
+            ).fetchone()
+        if row is None:
+            return None, None, None
+        headlines = json.loads(row[0]) if row[0] is not None else None
+        return headlines, row[1], row[2]
+
+    def acquire_lease(self, feed, owner):
+        """Tries to take the refresh lease for a feed. Returns True on success."""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO headline_cache (feed, lease_until) VALUES (?, 0)", (feed,)
+            )
+            cursor = conn.execute(
+                "UPDATE headline_cache SET lease_owner = ?, lease_until = ? "
+                "WHERE feed = ? AND lease_until < ?",
+                (owner, now + REFRESH_LEASE_SECONDS, feed, now)
+            )
+            return cursor.rowcount == 1
+
+    def put(self, feed, headlines, owner):
+        """Stores fresh headlines and releases this owner's lease."""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE headline_cache SET headlines = ?, fetched_at = ?, failed_at = NULL, lease_until = 0 "
+                "WHERE feed = ? AND lease_owner = ?",
+                (json.dumps(headlines), time.time(), feed, owner)
+            )
+
+    def mark_failed(self, feed, owner):
+        """Records a failed fetch (keeping any old headlines) and releases the lease."""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE headline_cache SET failed_at = ?, lease_until = 0 WHERE feed = ? AND lease_owner = ?",
+                (time.time(), feed, owner)
+            )
+
+    def release_lease(self, feed, owner):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE headline_cache SET lease_until = 0 WHERE feed = ? AND lease_owner = ?",
+                (feed, owner)
+            )
+
+
+class HeadlinePrefetcher:
+    """
+    Refreshes every registered feed in the background before it expires,
+    and serves headlines from the shared store with stale-while-revalidate
+    semantics. Requests never wait on the network.
+    """
+
+    def __init__(self, store, feeds=HEADLINE_FEEDS):
+        self.store = store
+        self.feeds = feeds
+        # Unique per process, used as the owner of refresh leases
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._in_flight = set()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="headline-prefetcher", daemon=True)
+            self._thread.start()
+
+    def _needs_refresh(self, fetched_at, failed_at, max_age):
+        now = time.time()
+        if failed_at is not None and now - failed_at < RETRY_FAILED_AFTER_SECONDS:
+            return False
+        return fetched_at is None or now - fetched_at > max_age
+
+    def _run(self):
+        while True:
+            for feed in self.feeds:
+                # One bad feed (or a locked database) mustn't stop the loop
+                try:
+                    _, fetched_at, failed_at = self.store.get(feed)
+                    if self._needs_refresh(fetched_at, failed_at, REFRESH_AFTER_SECONDS):
+                        self.refresh(feed)
+                except Exception as e:
+                    print(f"An error occurred in the headline prefetcher for {feed}: {e}")
+            time.sleep(PREFETCH_INTERVAL_SECONDS)
+
+    def _claim(self, feed):
+        # Only one refresh per feed runs in this process at a time
+        with self._lock:
+            if feed in self._in_flight:
+                return False
+            self._in_flight.add(feed)
+            return True
+
+    def refresh(self, feed):
+        """
+        Refetches one feed, unless a refresh for it is already running in
+        this process (or, via the lease, in any other worker).
+        """
+        if self._claim(feed):
+            self._refresh_claimed(feed)
+
+    def _refresh_claimed(self, feed):
+        try:
+            if not self.store.acquire_lease(feed, self.owner):
+                return
+            print(f"--- PREFETCHING {feed.upper()} HEADLINES ---")
+            try:
+                headlines = self.feeds[feed]()
+            except Exception as e:
+                print(f"An error occurred while prefetching {feed} headlines: {e}")
+                headlines = None
+            # An empty result usually means the feed is down; keep the old copy
+            if headlines:
+                self.store.put(feed, headlines, self.owner)
+            else:
+                self.store.mark_failed(feed, self.owner)
+        except Exception as e:
+            print(f"An error occurred while refreshing {feed} headlines: {e}")
+        finally:
+            with self._lock:
+                self._in_flight.discard(feed)
+
+    def refresh_in_background(self, feed):
+        # Claim first, so repeated requests don't each start a thread
+        if self._claim(feed):
+            threading.Thread(target=self._refresh_claimed, args=(feed,), daemon=True).start()
+
+    def cached(self, feed):
+        """Returns whatever headlines are stored for a feed, without refreshing it."""
+        headlines, _, _ = self.store.get(feed)
+        return headlines or []
+
+    def get(self, feed):
+        """
+        Returns (headlines, pending). Stale headlines are returned as-is
+        while a refresh runs in the background. `pending` is True when we
+        have nothing cached yet and a first fetch is under way; once that
+        fetch has failed we return ([], False) until a retry succeeds.
+        """
+        headlines, fetched_at, failed_at = self.store.get(feed)
+        if self._needs_refresh(fetched_at, failed_at, STALE_AFTER_SECONDS):
+            self.refresh_in_background(feed)
+        if headlines is None:
+            return [], failed_at is None
+        return headlines, False
@@ -0,0 +1,141 @@
+# scraper/http_fetcher.py
+
+import threading
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# --- Fetch tiers ---
+# Tier 1 is a plain HTTP GET over a pooled keep-alive session.
+# Tier 2 is a full Chrome render through the shared driver pool.
+TIER_HTTP = 'http'
+TIER_BROWSER = 'browser'
+
+HTTP_TIMEOUT_SECONDS = 10
+# Text shorter than this from a plain GET is treated as a failed
+# extraction (consent walls, JS shells), and we escalate to Selenium
+MIN_ARTICLE_CHARS = 300
+# Domains that prefer the browser still get a plain GET every so often,
+# in case the site changed and no longer needs JS
+HTTP_RETRY_EVERY = 20
+# Hosts whose article links only resolve through a JavaScript redirect
+JS_REDIRECT_HOSTS = ('news.google.com',)
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+
+session = requests.Session()
+session.headers.update({
+    'User-Agent': USER_AGENT,
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9',
+})
+_adapter = HTTPAdapter(pool_connections=20, pool_maxsize=20)
+session.mount('http://', _adapter)
+session.mount('https://', _adapter)
+
+class ArticleFetchError(Exception):
+    """Raised when an article couldn't be fetched; the message is user-facing."""
+
+
+# Per-domain stats: how often each tier worked, and which one to try first
+_domain_stats = {}
+_stats_lock = threading.Lock()
+
+
+def _domain(url):
+    return urlparse(url).netloc.lower()
+
+
+def _stats_for(domain):
+    return _domain_stats.setdefault(domain, {
+        'http_ok': 0,
+        'http_failed': 0,
+        'browser_ok': 0,
+        'browser_failed': 0,
+        'preferred_tier': TIER_HTTP,
+        'fetches': 0,
+    })
+
+
+def _record(domain, tier, ok):
+    with _stats_lock:
+        stats = _stats_for(domain)
+        stats[f"{tier}_{'ok' if ok else 'failed'}"] += 1
+        if ok:
+            stats['preferred_tier'] = tier
+
+
+def _should_try_http(url):
+    domain = _domain(url)
+    if any(domain.endswith(host) for host in JS_REDIRECT_HOSTS):
+        return False
+    with _stats_lock:
+        stats = _stats_for(domain)
+        stats['fetches'] += 1
+        if stats['preferred_tier'] == TIER_HTTP:
+            return True
+        return stats['fetches'] % HTTP_RETRY_EVERY == 0
+
+
+def get_domain_stats():
+    """Returns a copy of the per-domain tier statistics."""
+    with _stats_lock:
+        return {domain: dict(stats) for domain, stats in _domain_stats.items()}
+
+
+def fetch_html(url):
+    """
+    Fetches a page with a plain GET. Returns the HTML, or None if the
+    request failed or landed on a page that needs a JavaScript redirect.
+    """
+    try:
+        response = session.get(url, timeout=HTTP_TIMEOUT_SECONDS)
+        response.raise_for_status()
+    except requests.RequestException as e:
+        print(f"Plain HTTP fetch failed for {url}: {e}")
+        return None
+
+    if any(_domain(response.url).endswith(host) for host in JS_REDIRECT_HOSTS):
+        print("Page needs a JavaScript redirect; plain HTTP can't follow it.")
+        return None
+    return response.text
+
+
+def fetch_article_text(url, extract, render_with_browser, not_found_message):
+    """
+    Tiered article fetch.
+
+    - `extract(html)` returns the article text, or None if it can't find it.
+    - `render_with_browser(url)` returns (html, None) on success, or
+      (None, error_message) if Selenium couldn't load the page.
+
+    We try a plain HTTP GET first (unless this domain has needed the
+    browser before), and only escalate to Selenium when that fails.
+    Returns the article text, or raises ArticleFetchError with the
+    browser's error message (or `not_found_message`) if both fail.
+    """
+    domain = _domain(url)
+
+    if _should_try_http(url):
+        html = fetch_html(url)
+        text = extract(html) if html else None
+        if text and len(text) >= MIN_ARTICLE_CHARS:
+            print(f"Fetched article over plain HTTP from {domain}.")
+            _record(domain, TIER_HTTP, True)
+            return text
+        _record(domain, TIER_HTTP, False)
+        print(f"Plain HTTP didn't yield the article for {domain}. Escalating to Selenium...")
+
+    html, error_message = render_with_browser(url)
+    if html is None:
+        _record(domain, TIER_BROWSER, False)
+        raise ArticleFetchError(error_message)
+
+    text = extract(html)
+    if not text:
+        _record(domain, TIER_BROWSER, False)
+        raise ArticleFetchError(not_found_message)
+
+    _record(domain, TIER_BROWSER, True)
+    return text
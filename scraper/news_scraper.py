@@ -1,10 +1,19 @@
 # scraper/news_scraper.py
-import feedparser
 from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service as ChromeService
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.support.ui import WebDriverWait
+from scraper.driver_pool import driver_pool
+from scraper.feeds import parse_feed
+from scraper.http_fetcher import fetch_article_text
+
+# Map our category names to the specific Google News RSS URLs
+CATEGORY_URLS = {
+    'general': 'https://news.google.com/rss?ned=in&hl=en-IN&gl=IN',
+    'business': 'https://news.google.com/rss/headlines/section/topic/BUSINESS.en_in/BUSINESS?ned=in&hl=en-IN&gl=IN',
+    'technology': 'https://news.google.com/rss/headlines/section/topic/TECHNOLOGY.en_in/TECHNOLOGY?ned=in&hl=en-IN&gl=IN',
+    'sports': 'https://news.google.com/rss/headlines/section/topic/SPORTS.en_in/SPORTS?ned=in&hl=en-IN&gl=IN',
+    'entertainment': 'https://news.google.com/rss/headlines/section/topic/ENTERTAINMENT.en_in/ENTERTAINMENT?ned=in&hl=en-IN&gl=IN'
+}
+NEWS_CATEGORIES = list(CATEGORY_URLS)
 
 def get_headlines(category='general'):
     """
@@ -12,22 +21,13 @@ def get_headlines(category='general'):
     """
     print(f"Fetching headlines for category: {category}")
     
-    # Map our category names to the specific Google News RSS URLs
-    category_urls = {
-        'general': 'https://news.google.com/rss?ned=in&hl=en-IN&gl=IN',
-        'business': 'https://news.google.com/rss/headlines/section/topic/BUSINESS.en_in/BUSINESS?ned=in&hl=en-IN&gl=IN',
-        'technology': 'https://news.google.com/rss/headlines/section/topic/TECHNOLOGY.en_in/TECHNOLOGY?ned=in&hl=en-IN&gl=IN',
-        'sports': 'https://news.google.com/rss/headlines/section/topic/SPORTS.en_in/SPORTS?ned=in&hl=en-IN&gl=IN',
-        'entertainment': 'https://news.google.com/rss/headlines/section/topic/ENTERTAINMENT.en_in/ENTERTAINMENT?ned=in&hl=en-IN&gl=IN'
-    }
-    
     # Get the correct URL, or fall back to the general one
-    url = category_urls.get(category, category_urls['general'])
+    url = CATEGORY_URLS.get(category, CATEGORY_URLS['general'])
     
     headlines = []
     try:
-        feed = feedparser.parse(url)
-        for entry in feed.entries:
+        entries = parse_feed(url)
+        for entry in entries:
             headlines.append({
                 'headline': entry.title,
                 'url': entry.link
@@ -39,38 +39,10 @@ def get_headlines(category='general'):
     print(f"Found {len(headlines)} headlines from RSS. Returning up to 30.")
     return headlines[:30]
 
-def get_article_text(url):
-    # This function remains unchanged
-    print(f"Fetching article with Selenium from: {url}")
-    options = webdriver.ChromeOptions()
-    options.add_argument('--headless')
-    options.add_argument('--no-sandbox')
-    options.add_argument('--disable-dev-shm-usage')
-    options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
-    options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    options.add_experimental_option('useAutomationExtension', False)
-    
-    driver = None
-    try:
-        service = ChromeService(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=options)
-        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-        driver.set_page_load_timeout(60)
-        driver.get(url)
-
-        print("Waiting for redirect...")
-        WebDriverWait(driver, 60).until(lambda d: "google.com" not in d.current_url)
-        print(f"Redirect complete. Final URL: {driver.current_url}")
-        
-        html_content = driver.page_source
-        
-    except Exception as e:
-        print(f"An error occurred with Selenium: {e}")
-        return "This website is actively blocking scraping attempts or timed out after 60 seconds. Please try another article."
-    finally:
-        if driver:
-            driver.quit()
-
+def _extract_article_text(html_content):
+    """
+    Tries a list of common article selectors, or returns None.
+    """
     soup = BeautifulSoup(html_content, 'html.parser')
     possible_selectors = ['article', 'div.article-body', 'div.story-body', 'div.main-content']
     
@@ -85,5 +57,33 @@ def get_article_text(url):
         for tag in article_body(['script', 'style']):
             tag.decompose()
         return article_body.get_text(separator='\n\n', strip=True)
-    else:
-        return "Found the page, but could not automatically find the main article content."
\ No newline at end of file
+    return None
+
+def _render_article_page(url):
+    """
+    Renders a page with a pooled Selenium driver and waits for the
+    Google News redirect. Returns (html, None) or (None, error_message).
+    """
+    print(f"Fetching article with Selenium from: {url}")
+    try:
+        with driver_pool.driver() as driver:
+            driver.get(url)
+
+            print("Waiting for redirect...")
+            WebDriverWait(driver, 60).until(lambda d: "google.com" not in d.current_url)
+            print(f"Redirect complete. Final URL: {driver.current_url}")
+        
+            return driver.page_source, None
+        
+    except Exception as e:
+        print(f"An error occurred with Selenium: {e}")
+        return None, "This website is actively blocking scraping attempts or timed out after 60 seconds. Please try another article."
+
+def get_article_text(url):
+    print(f"Fetching article from: {url}")
+    return fetch_article_text(
+        url,
+        _extract_article_text,
+        _render_article_page,
+        "Found the page, but could not automatically find the main article content."
+    )
@@ -1,14 +1,13 @@
 # scraper/reuters_scraper.py
 
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service as ChromeService
-from webdriver_manager.chrome import ChromeDriverManager
 from bs4 import BeautifulSoup
 from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
-import feedparser
+from scraper.driver_pool import driver_pool
+from scraper.feeds import parse_feed
+from scraper.http_fetcher import fetch_article_text
 
 def get_reuters_headlines():
     """
@@ -23,9 +22,9 @@ def get_reuters_headlines():
     
     headlines = []
     try:
-        feed = feedparser.parse(url)
+        entries = parse_feed(url)
         
-        for entry in feed.entries:
+        for entry in entries:
             headlines.append({
                 'headline': entry.title,
                 'url': entry.link
@@ -39,45 +38,10 @@ def get_reuters_headlines():
     return headlines[:30]
 
 
-def get_reuters_article_text(url):
+def _extract_reuters_text(html_content):
     """
-    Uses Selenium to fetch the full article text from a Reuters page.
+    Pulls the article body out of a Reuters page, or returns None.
     """
-    print(f"--- FETCHING REUTERS ARTICLE TEXT WITH SELENIUM FROM: {url} ---")
-    options = webdriver.ChromeOptions()
-    options.add_argument('--headless')
-    options.add_argument('--no-sandbox')
-    options.add_argument('--disable-dev-shm-usage')
-    options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
-    options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    options.add_experimental_option('useAutomationExtension', False)
-    
-    driver = None
-    try:
-        service = ChromeService(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=options)
-        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-        driver.set_page_load_timeout(60)
-
-        try:
-            driver.get(url)
-        except TimeoutException:
-            print("Page load for article timed out.")
-            driver.quit()
-            return "Could not load the article page in time. It may be blocking requests."
-
-        # Wait for the body tag to be present
-        WebDriverWait(driver, 20).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-        
-        html_content = driver.page_source
-        
-    except Exception as e:
-        print(f"An error occurred with Selenium while fetching the article: {e}")
-        return "This website is actively blocking scraping attempts. Please try another article."
-    finally:
-        if driver:
-            driver.quit()
-
     soup = BeautifulSoup(html_content, 'html.parser')
     
     # Attempt 1: Find all paragraphs with the specific testid
@@ -104,4 +68,42 @@ def get_reuters_article_text(url):
         article_text = '\n\n'.join(p.get_text(strip=True) for p in all_paragraphs)
         return article_text
 
-    return "Found the page, but could not find the main article content. The layout is unrecognized."
\ No newline at end of file
+    return None
+
+
+def _render_reuters_page(url):
+    """
+    Renders a Reuters page with a pooled Selenium driver.
+    Returns (html, None), or (None, error_message) on failure.
+    """
+    print(f"--- FETCHING REUTERS ARTICLE TEXT WITH SELENIUM FROM: {url} ---")
+    try:
+        with driver_pool.driver() as driver:
+            try:
+                driver.get(url)
+            except TimeoutException:
+                print("Page load for article timed out.")
+                return None, "Could not load the article page in time. It may be blocking requests."
+
+            # Wait for the body tag to be present
+            WebDriverWait(driver, 20).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
+        
+            return driver.page_source, None
+        
+    except Exception as e:
+        print(f"An error occurred with Selenium while fetching the article: {e}")
+        return None, "This website is actively blocking scraping attempts. Please try another article."
+
+
+def get_reuters_article_text(url):
+    """
+    Fetches the full article text from a Reuters page. Tries a plain HTTP
+    GET first and falls back to Selenium if that doesn't work.
+    """
+    print(f"--- FETCHING REUTERS ARTICLE TEXT FROM: {url} ---")
+    return fetch_article_text(
+        url,
+        _extract_reuters_text,
+        _render_reuters_page,
+        "Found the page, but could not find the main article content. The layout is unrecognized."
+    )
@@ -1,15 +1,13 @@
 # scraper/toi_scraper.py
 
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service as ChromeService
-from webdriver_manager.chrome import ChromeDriverManager
 from bs4 import BeautifulSoup
 from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
-# --- NEW: Import feedparser ---
-import feedparser 
+from scraper.driver_pool import driver_pool
+from scraper.feeds import parse_feed
+from scraper.http_fetcher import fetch_article_text
 
 def get_toi_headlines():
     """
@@ -22,9 +20,9 @@ def get_toi_headlines():
     
     headlines = []
     try:
-        feed = feedparser.parse(url)
+        entries = parse_feed(url)
         
-        for entry in feed.entries:
+        for entry in entries:
             headlines.append({
                 'headline': entry.title,
                 'url': entry.link
@@ -38,49 +36,51 @@ def get_toi_headlines():
     return headlines[:30]
 
 
-def get_toi_article_text(url):
+def _extract_toi_text(html_content):
     """
-    Uses a robust Selenium instance to fetch the full article text from TOI.
+    Pulls the article body out of a TOI page, or returns None.
     """
-    print(f"--- FETCHING TOI ARTICLE TEXT WITH SELENIUM FROM: {url} ---")
-    options = webdriver.ChromeOptions()
-    options.add_argument('--headless')
-    options.add_argument('--no-sandbox')
-    options.add_argument('--disable-dev-shm-usage')
-    options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
-    options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    options.add_experimental_option('useAutomationExtension', False)
+    soup = BeautifulSoup(html_content, 'html.parser')
+    article_div = soup.find('div', class_='_s30J')
     
-    driver = None
-    try:
-        service = ChromeService(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=options)
-        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-        driver.set_page_load_timeout(60)
+    if article_div:
+        return article_div.get_text(separator='\n\n', strip=True)
+    return None
 
-        try:
-            driver.get(url)
-        except TimeoutException:
-            print("Page load for article timed out.")
-            driver.quit()
-            return "Could not load the article page in time. It may be blocking requests."
 
-        # Wait for the main article div (class _s30J)
-        WebDriverWait(driver, 20).until(EC.presence_of_element_located((By.CLASS_NAME, "_s30J")))
+def _render_toi_page(url):
+    """
+    Renders a TOI page with a pooled Selenium driver.
+    Returns (html, None), or (None, error_message) on failure.
+    """
+    print(f"--- FETCHING TOI ARTICLE TEXT WITH SELENIUM FROM: {url} ---")
+    try:
+        with driver_pool.driver() as driver:
+            try:
+                driver.get(url)
+            except TimeoutException:
+                print("Page load for article timed out.")
+                return None, "Could not load the article page in time. It may be blocking requests."
+
+            # Wait for the main article div (class _s30J)
+            WebDriverWait(driver, 20).until(EC.presence_of_element_located((By.CLASS_NAME, "_s30J")))
         
-        html_content = driver.page_source
+            return driver.page_source, None
         
     except Exception as e:
         print(f"An error occurred with Selenium while fetching the article: {e}")
-        return "This website is actively blocking scraping attempts. Please try another article."
-    finally:
-        if driver:
-            driver.quit()
+        return None, "This website is actively blocking scraping attempts. Please try another article."
 
-    soup = BeautifulSoup(html_content, 'html.parser')
-    article_div = soup.find('div', class_='_s30J')
-    
-    if article_div:
-        return article_div.get_text(separator='\n\n', strip=True)
-    else:
-        return "Found the page, but could not find the main article content. The layout may have changed."
\ No newline at end of file
+
+def get_toi_article_text(url):
+    """
+    Fetches the full article text from TOI. Tries a plain HTTP GET first
+    and falls back to a robust Selenium instance if that doesn't work.
+    """
+    print(f"--- FETCHING TOI ARTICLE TEXT FROM: {url} ---")
+    return fetch_article_text(
+        url,
+        _extract_toi_text,
+        _render_toi_page,
+        "Found the page, but could not find the main article content. The layout may have changed."
+    )
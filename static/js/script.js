@@ -63,7 +63,10 @@ document.addEventListener('DOMContentLoaded', () => {
         });
     });
 
-    function fetchHeadlines(publisher) {
+    // Give up waiting on a first fetch after this many polls (2s apart)
+    const MAX_HEADLINE_POLLS = 15;
+
+    function fetchHeadlines(publisher, poll = 0) {
         let sourceName = "Unknown";
         if (publisher === 'toi') {
             sourceName = "TOI (India)";
@@ -76,8 +79,16 @@ document.addEventListener('DOMContentLoaded', () => {
         summaryContainer.innerHTML = '';
 
         fetch(`/api/headlines/${publisher}`)
-            .then(response => response.json())
+            .then(response => {
+                // The server has nothing cached yet and is fetching in the background
+                if (response.headers.get('X-Headlines-Pending') && poll < MAX_HEADLINE_POLLS) {
+                    setTimeout(() => fetchHeadlines(publisher, poll + 1), 2000);
+                    return null;
+                }
+                return response.json();
+            })
             .then(headlines => {
+                if (headlines === null) return;
                 headlinesContainer.innerHTML = `<h2>Top Stories from ${sourceName}</h2>`;
                 if (!headlines || headlines.length === 0) {
                     headlinesContainer.innerHTML += '<p>Could not fetch headlines. The RSS feed may be down.</p>';
@@ -95,6 +106,24 @@ document.addEventListener('DOMContentLoaded', () => {
                         fetchArticle(article.url);
                     });
                     li.appendChild(a);
+                    // Other headlines (from any feed) that tell the same story
+                    if (article.duplicates && article.duplicates.length > 0) {
+                        const similar = document.createElement('ul');
+                        similar.className = 'headline-duplicates';
+                        article.duplicates.forEach(duplicate => {
+                            const item = document.createElement('li');
+                            const link = document.createElement('a');
+                            link.href = duplicate.url;
+                            link.textContent = `${duplicate.headline} (${duplicate.feed})`;
+                            link.addEventListener('click', e => {
+                                e.preventDefault();
+                                fetchArticle(duplicate.url);
+                            });
+                            item.appendChild(link);
+                            similar.appendChild(item);
+                        });
+                        li.appendChild(similar);
+                    }
                     ul.appendChild(li);
                 });
                 headlinesContainer.appendChild(ul);
@@ -106,53 +135,142 @@ document.addEventListener('DOMContentLoaded', () => {
         summaryContainer.innerHTML = '';
         articleContainer.scrollIntoView({ behavior: 'smooth', block: 'start' });
 
-        fetch('/api/get_article', {
+        // Start a background fetch job, then poll it until it finishes
+        fetch('/api/get_article/jobs', {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
                 body: JSON.stringify({ url: url }),
-                signal: AbortSignal.timeout(120000)
             })
             .then(response => response.json())
             .then(data => {
-                if (!data || !data.article_text || data.article_text.includes("Could not") || data.article_text.includes("blocking") || data.article_text.includes("unrecognized")) {
-                    articleContainer.innerHTML = `<p class="loading-message">${data.article_text || 'Error: Could not fetch article content.'}</p>`;
+                if (!data.job_id) {
+                    articleContainer.innerHTML = `<p class="loading-message">${data.error || 'Error: Could not fetch article content.'}</p>`;
                     return;
                 }
-                articleContainer.innerHTML = `
-                <div class="article-content">
-                    <h2>Full Article</h2>
-                    <p id="full-article-text">${data.article_text.replace(/\n/g, '<br>')}</p>
-                    <button id="summarize-btn">Summarize This Article</button>
-                </div>`;
-                document.getElementById('summarize-btn').addEventListener('click', () => {
-                    const text = document.getElementById('full-article-text').innerText;
-                    fetchSummary(text, "Online Article");
-                });
+                pollArticleJob(data.job_id, Date.now());
             })
             .catch(error => {
                 console.error('Fetch article error:', error);
-                articleContainer.innerHTML = `<p class="loading-message">Error: The request took too long and timed out.</p>`;
+                articleContainer.innerHTML = `<p class="loading-message">Error: Could not start fetching the article.</p>`;
             });
     }
 
-    function fetchSummary(text, source) {
-        summaryContainer.innerHTML = '<p class="loading-message">🤖 AI is summarizing (this may take a moment for long articles)...</p>';
-        summaryContainer.scrollIntoView({ behavior: 'smooth', block: 'start' });
+    function pollArticleJob(jobId, startedAt) {
+        if (Date.now() - startedAt > 120000) {
+            articleContainer.innerHTML = `<p class="loading-message">Error: The request took too long and timed out.</p>`;
+            return;
+        }
 
-        fetch('/api/summarize', {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ text: text, source: source }),
-            })
+        fetch(`/api/get_article/jobs/${jobId}`)
             .then(response => response.json())
-            .then(data => {
+            .then(job => {
+                if (job.status === 'pending' || job.status === 'running') {
+                    setTimeout(() => pollArticleJob(jobId, startedAt), 1500);
+                    return;
+                }
+                showArticle(job);
+            })
+            .catch(error => {
+                console.error('Fetch article error:', error);
+                articleContainer.innerHTML = `<p class="loading-message">Error: Could not fetch article content.</p>`;
+            });
+    }
+
+    function showArticle(data) {
+        // A failed fetch comes back as an error, never as article text
+        if (!data || data.error || !data.article_text) {
+            articleContainer.innerHTML = `<p class="loading-message">${(data && data.error) || 'Error: Could not fetch article content.'}</p>`;
+            return;
+        }
+        articleContainer.innerHTML = `
+        <div class="article-content">
+            <h2>Full Article</h2>
+            <p id="full-article-text">${data.article_text.replace(/\n/g, '<br>')}</p>
+            <button id="summarize-btn">Summarize This Article</button>
+        </div>`;
+        document.getElementById('summarize-btn').addEventListener('click', () => {
+            const text = document.getElementById('full-article-text').innerText;
+            fetchSummary(text, "Online Article");
+        });
+    }
+
+    function fetchSummary(text, source) {
+        summaryContainer.innerHTML = `
+            <div class="summary-content">
+                <h2>AI Summary</h2>
+                <p class="loading-message" id="summary-progress">🤖 AI is summarizing (this may take a moment for long articles)...</p>
+                <p id="summary-stream"></p>
+            </div>`;
+        summaryContainer.scrollIntoView({ behavior: 'smooth', block: 'start' });
+        const progressEl = document.getElementById('summary-progress');
+        const streamEl = document.getElementById('summary-stream');
+
+        // The summary streams back as Server-Sent Events. EventSource can't
+        // POST, so we read the response body and split out the events ourselves.
+        let finished = false;
+        function handleEvent(event, data) {
+            if (event === 'done' || event === 'error') finished = true;
+            if (event === 'progress') {
+                progressEl.textContent = `Summarized part ${data.chunk} of ${data.total}...`;
+                streamEl.textContent += (streamEl.textContent ? ' ' : '') + data.mini_summary;
+            } else if (event === 'token') {
+                if (progressEl.textContent !== 'Writing the final summary...') {
+                    progressEl.textContent = 'Writing the final summary...';
+                    streamEl.textContent = '';
+                }
+                streamEl.textContent += data.text;
+            } else if (event === 'done') {
                 summaryContainer.innerHTML = `
                     <div class="summary-content">
                         <h2>AI Summary</h2>
                         <h4 class="category-tag">Category: ${data.category}</h4>
                         <p>${data.summary}</p>
                     </div>`;
-                summaryContainer.scrollIntoView({ behavior: 'smooth', block: 'start' });
+            } else if (event === 'error') {
+                summaryContainer.innerHTML = `<p class="loading-message">${data.error}</p>`;
+            }
+        }
+
+        fetch('/api/summarize/stream', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ text: text, source: source }),
+            })
+            .then(response => {
+                if (!response.ok) {
+                    throw new Error(`The server answered ${response.status}`);
+                }
+                const reader = response.body.getReader();
+                const decoder = new TextDecoder();
+                let buffer = '';
+
+                function read() {
+                    return reader.read().then(({ done, value }) => {
+                        if (done) {
+                            // The stream was cut off before the summary arrived
+                            if (!finished) throw new Error('The summary stream ended early');
+                            return;
+                        }
+                        buffer += decoder.decode(value, { stream: true });
+                        const messages = buffer.split('\n\n');
+                        buffer = messages.pop();
+                        messages.forEach(message => {
+                            let event = 'message';
+                            let data = '';
+                            message.split('\n').forEach(line => {
+                                if (line.startsWith('event: ')) event = line.slice(7);
+                                else if (line.startsWith('data: ')) data += line.slice(6);
+                            });
+                            if (data) handleEvent(event, JSON.parse(data));
+                        });
+                        return read();
+                    });
+                }
+                return read();
+            })
+            .catch(error => {
+                console.error('Summary error:', error);
+                summaryContainer.innerHTML = `<p class="loading-message">An error occurred while summarizing.</p>`;
             });
     }
 
@@ -0,0 +1,60 @@
+// Full-text search box for the History page.
+// Mounts itself at the top of #history-container, if the page has one.
+document.addEventListener('DOMContentLoaded', () => {
+    const historyContainer = document.getElementById('history-container');
+    if (!historyContainer) return;
+
+    const searchBox = document.createElement('div');
+    searchBox.id = 'history-search';
+    searchBox.innerHTML = `
+        <form id="history-search-form">
+            <input type="search" id="history-search-input" placeholder="Search past articles and summaries...">
+            <button type="submit" class="submit-btn">Search</button>
+        </form>
+        <div id="history-search-results"></div>`;
+    historyContainer.prepend(searchBox);
+
+    const form = document.getElementById('history-search-form');
+    const input = document.getElementById('history-search-input');
+    const resultsContainer = document.getElementById('history-search-results');
+
+    // Source and category are stored as the client sent them, so they
+    // must be escaped before they go into innerHTML
+    function escapeHtml(value) {
+        const element = document.createElement('span');
+        element.textContent = value;
+        return element.innerHTML;
+    }
+
+    form.addEventListener('submit', (e) => {
+        e.preventDefault();
+        const query = input.value.trim();
+        if (!query) {
+            resultsContainer.innerHTML = '';
+            return;
+        }
+
+        resultsContainer.innerHTML = '<p class="loading-message">Searching...</p>';
+        fetch(`/api/search?q=${encodeURIComponent(query)}`)
+            .then(response => response.json())
+            .then(data => {
+                if (!data.results || data.results.length === 0) {
+                    resultsContainer.innerHTML = '<p class="loading-message">No matching summaries found.</p>';
+                    return;
+                }
+                // Snippets come back HTML-escaped, with matches wrapped in <mark>
+                resultsContainer.innerHTML = data.results.map(result => `
+                    <div class="history-item">
+                        <div class="history-meta">
+                            ${escapeHtml(result.source)} · ${escapeHtml(new Date(result.date_saved + 'Z').toLocaleString())} · ${escapeHtml(result.category || 'Uncategorized')}
+                        </div>
+                        <p><strong>Summary:</strong> ${result.summary_snippet}</p>
+                        <p class="search-snippet"><strong>Article:</strong> ${result.article_snippet}</p>
+                    </div>`).join('');
+            })
+            .catch(error => {
+                console.error('Search error:', error);
+                resultsContainer.innerHTML = '<p class="loading-message">An error occurred while searching.</p>';
+            });
+    });
+});
@@ -0,0 +1,79 @@
+# summarizer/backends.py
+
+import os
+
+# --- Inference backends ---
+# pytorch: the plain fp32 PyTorch model (the default)
+# int8:    PyTorch with dynamic int8 quantization of the Linear layers
+# onnx:    an exported ONNX model run by ONNX Runtime (needs `optimum[onnxruntime]`)
+BACKEND_PYTORCH = 'pytorch'
+BACKEND_INT8 = 'int8'
+BACKEND_ONNX = 'onnx'
+BACKENDS = (BACKEND_PYTORCH, BACKEND_INT8, BACKEND_ONNX)
+
+# Pick the backend for both the summarizer and the classifier
+INFERENCE_BACKEND = os.environ.get('INFERENCE_BACKEND', BACKEND_PYTORCH)
+if INFERENCE_BACKEND not in BACKENDS:
+    print(f"Unknown INFERENCE_BACKEND '{INFERENCE_BACKEND}'. Using '{BACKEND_PYTORCH}'.")
+    INFERENCE_BACKEND = BACKEND_PYTORCH
+
+
+def onnx_model_dir(model_path):
+    """Where export_model.py saves the ONNX version of a model."""
+    return model_path.rstrip('/\\') + '-onnx'
+
+
+def classifier_onnx_dir(model_id):
+    """Where export_model.py saves the ONNX version of a hub classifier."""
+    return onnx_model_dir(os.path.join('.', model_id.replace('/', '--')))
+
+
+def _quantize(model):
+    import torch
+
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def load_seq2seq_model(model_path, backend=INFERENCE_BACKEND):
+    """
+    Loads a seq2seq model (our summarizer) for the given backend.
+    For ONNX we use the exported copy if there is one, and otherwise
+    export it on the fly (slow, so run export_model.py ahead of time).
+    """
+    if backend == BACKEND_ONNX:
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM
+
+        if os.path.isdir(onnx_model_dir(model_path)):
+            return ORTModelForSeq2SeqLM.from_pretrained(onnx_model_dir(model_path))
+        print(f"No exported ONNX model for {model_path}. Exporting it now...")
+        return ORTModelForSeq2SeqLM.from_pretrained(model_path, export=True)
+
+    from transformers import AutoModelForSeq2SeqLM
+
+    model = AutoModelForSeq2SeqLM.from_pretrained(model_path)
+    model.eval()
+    if backend == BACKEND_INT8:
+        model = _quantize(model)
+    return model
+
+
+def load_classification_model(model_path, backend=INFERENCE_BACKEND):
+    """
+    Loads a sequence-classification model (our zero-shot NLI classifier)
+    for the given backend.
+    """
+    if backend == BACKEND_ONNX:
+        from optimum.onnxruntime import ORTModelForSequenceClassification
+
+        if os.path.isdir(classifier_onnx_dir(model_path)):
+            return ORTModelForSequenceClassification.from_pretrained(classifier_onnx_dir(model_path))
+        print(f"No exported ONNX model for {model_path}. Exporting it now...")
+        return ORTModelForSequenceClassification.from_pretrained(model_path, export=True)
+
+    from transformers import AutoModelForSequenceClassification
+
+    model = AutoModelForSequenceClassification.from_pretrained(model_path)
+    model.eval()
+    if backend == BACKEND_INT8:
+        model = _quantize(model)
+    return model
@@ -0,0 +1,100 @@
+# summarizer/batcher.py
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+# How long callers wait for a result before giving up. Generous, since a
+# request may queue behind several full batches on a busy CPU.
+RESULT_TIMEOUT_SECONDS = 300
+
+
+class BatchScheduler:
+    """
+    Collects inference requests from many threads into a single queue and
+    runs them through the model as micro-batches on one worker thread.
+
+    A batch is closed as soon as it holds `max_batch_size` items or the
+    oldest item has waited `max_wait` seconds. Items are grouped by `key`
+    (e.g. generation settings) so only compatible inputs share a batch.
+    `process_batch(key, items)` must return one result per item, in order.
+    """
+
+    def __init__(self, process_batch, max_batch_size=8, max_wait=0.02, name="batch-scheduler"):
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.name = name
+        self._queue = queue.Queue()
+        self._worker = None
+        self._worker_lock = threading.Lock()
+
+    def _ensure_worker(self):
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._worker.start()
+
+    def submit(self, item, key=None):
+        """
+        Queues one item and returns a Future that resolves to its result.
+        """
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((key, item, future))
+        return future
+
+    def run(self, items, key=None, timeout=RESULT_TIMEOUT_SECONDS):
+        """
+        Queues several items and blocks until all their results are ready.
+        Raises concurrent.futures.TimeoutError if they take longer than
+        `timeout` seconds.
+        """
+        futures = [self.submit(item, key) for item in items]
+        deadline = time.monotonic() + timeout
+        return [future.result(timeout=max(0, deadline - time.monotonic())) for future in futures]
+
+    def _collect_batch(self):
+        # Block until there is at least one request, then keep
+        # collecting until the batch is full or the deadline passes
+        pending = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(pending) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                pending.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return pending
+
+    def _run(self):
+        while True:
+            pending = self._collect_batch()
+
+            groups = {}
+            for key, item, future in pending:
+                groups.setdefault(key, []).append((item, future))
+
+            for key, group in groups.items():
+                items = [item for item, _ in group]
+                try:
+                    results = list(self.process_batch(key, items))
+                except Exception as e:
+                    print(f"An error occurred in {self.name} while processing a batch: {e}")
+                    for _, future in group:
+                        future.set_exception(e)
+                    continue
+
+                if len(results) != len(group):
+                    # zip() would leave the extra futures waiting forever
+                    e = RuntimeError(f"{self.name} got {len(results)} results for a batch of {len(group)} items.")
+                    print(f"An error occurred in {self.name} while processing a batch: {e}")
+                    for _, future in group:
+                        future.set_exception(e)
+                    continue
+
+                for (_, future), result in zip(group, results):
+                    future.set_result(result)
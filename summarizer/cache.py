@@ -0,0 +1,107 @@
+# summarizer/cache.py
+
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+
+# How many summaries we keep before evicting the least recently used ones
+MAX_CACHE_ENTRIES = 5000
+
+
+def normalize_text(text):
+    """
+    Collapses all whitespace so the same article copied with different
+    line breaks or indentation maps to the same cache entry.
+    """
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def make_cache_key(text, model_id):
+    """
+    Builds a content-addressed key from the normalized article text and
+    the identity of the model(s) that produced the summary.
+    """
+    digest = hashlib.sha256()
+    digest.update(model_id.encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(normalize_text(text).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class SummaryCache:
+    """
+    A persistent, size-bounded LRU cache of summaries stored in a
+    sidecar SQLite file, so it survives restarts and is shared by
+    every worker process.
+    """
+
+    def __init__(self, db_path, max_entries=MAX_CACHE_ENTRIES):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS summary_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    summary_text TEXT NOT NULL,
+                    category TEXT,
+                    last_used REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_summary_cache_last_used ON summary_cache (last_used)"
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    def get(self, cache_key):
+        """
+        Returns (summary, category) for a cached entry, or None on a miss.
+        A hit also refreshes the entry's position in the LRU order.
+        """
+        try:
+            with self._lock, self._connect() as conn:
+                row = conn.execute(
+                    "SELECT summary_text, category FROM summary_cache WHERE cache_key = ?",
+                    (cache_key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                conn.execute(
+                    "UPDATE summary_cache SET last_used = ? WHERE cache_key = ?",
+                    (time.time(), cache_key)
+                )
+                return row[0], row[1]
+        except sqlite3.Error as e:
+            print(f"Error reading from summary cache: {e}")
+            return None
+
+    def put(self, cache_key, summary, category):
+        """
+        Stores a summary and evicts the least recently used entries
+        once the cache grows past max_entries.
+        """
+        try:
+            with self._lock, self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO summary_cache (cache_key, summary_text, category, last_used) "
+                    "VALUES (?, ?, ?, ?)",
+                    (cache_key, summary, category, time.time())
+                )
+                conn.execute(
+                    """
+                    DELETE FROM summary_cache WHERE cache_key IN (
+                        SELECT cache_key FROM summary_cache
+                        ORDER BY last_used DESC
+                        LIMIT -1 OFFSET ?
+                    )
+                    """,
+                    (self.max_entries,)
+                )
+        except sqlite3.Error as e:
+            print(f"Error writing to summary cache: {e}")
@@ -1,20 +1,142 @@
 # summarizer/categorizer.py
-from transformers import pipeline
+import os
+import threading
+from summarizer.batcher import BatchScheduler, RESULT_TIMEOUT_SECONDS
+from summarizer.backends import INFERENCE_BACKEND, load_classification_model
 
-print("Loading text classification model...")
 # Using the smaller, faster, distilled model
-classifier = pipeline("zero-shot-classification", model="valhalla/distilbart-mnli-12-3")
-print("Text classification model loaded.")
+CLASSIFIER_MODEL = "valhalla/distilbart-mnli-12-3"
+# --- Fast classifier ---
+# A TF-IDF + logistic regression model trained by train_categorizer.py on
+# the BBC categories. It runs in well under a millisecond, so we use it
+# when it is near-certain and fall back to the zero-shot model otherwise.
+FAST_MODEL_PATH = "./my-category-model.joblib"
+# The fast model only knows the five BBC labels, so a Science or World
+# News story still gets one of them, often with a fairly high score.
+# Only a near-certain answer skips the zero-shot model.
+CONFIDENCE_THRESHOLD = 0.9
+# The BBC dataset's folder names, mapped to our category labels
+BBC_CATEGORY_LABELS = {
+    'business': 'Business',
+    'entertainment': 'Entertainment',
+    'politics': 'Politics',
+    'sport': 'Sports',
+    'tech': 'Technology',
+}
+
+# Identifies the model(s) and the inference backend they run on
+CLASSIFIER_MODEL_ID = f"{CLASSIFIER_MODEL}@{INFERENCE_BACKEND}"
+if os.path.exists(FAST_MODEL_PATH):
+    # The threshold decides which model answers, so it's part of the id too
+    CLASSIFIER_MODEL_ID += f"+tfidf-{int(os.path.getmtime(FAST_MODEL_PATH))}@{CONFIDENCE_THRESHOLD}"
+
+# Filled in by load_classifier() / load_fast_classifier() on first use
+classifier = None
+fast_classifier = None
+_load_lock = threading.Lock()
+_fast_load_lock = threading.Lock()
+_fast_load_attempted = False
+
+def load_classifier():
+    """
+    Loads the zero-shot classifier exactly once, on first use.
+    """
+    global classifier
+    if classifier is not None:
+        return
+    
+    with _load_lock:
+        if classifier is not None:
+            return
+        from transformers import AutoTokenizer, pipeline
+        
+        print(f"Loading text classification model ({INFERENCE_BACKEND} backend)...")
+        classifier = pipeline(
+            "zero-shot-classification",
+            model=load_classification_model(CLASSIFIER_MODEL),
+            tokenizer=AutoTokenizer.from_pretrained(CLASSIFIER_MODEL)
+        )
+        print("Text classification model loaded.")
+
+def is_classifier_loaded():
+    return classifier is not None
+
+def load_fast_classifier():
+    """
+    Loads the trained TF-IDF classifier once, if train_categorizer.py
+    has produced one. Returns it, or None.
+    """
+    global fast_classifier, _fast_load_attempted
+    if _fast_load_attempted:
+        return fast_classifier
+    
+    with _fast_load_lock:
+        if not _fast_load_attempted:
+            if os.path.exists(FAST_MODEL_PATH):
+                try:
+                    import joblib
+                    fast_classifier = joblib.load(FAST_MODEL_PATH)
+                    print("Fast TF-IDF category model loaded.")
+                except Exception as e:
+                    print(f"Error loading fast category model: {e}")
+            _fast_load_attempted = True
+    return fast_classifier
+
+def _fast_categorize(text):
+    """
+    Returns (category, confidence) from the TF-IDF model, or (None, 0.0)
+    if there is no trained model or it picked a label we don't map.
+    """
+    fast_model = load_fast_classifier()
+    if fast_model is None:
+        return None, 0.0
+    probabilities = fast_model.predict_proba([text])[0]
+    best = probabilities.argmax()
+    category = BBC_CATEGORY_LABELS.get(fast_model.classes_[best])
+    if category is None:
+        return None, 0.0
+    return category, float(probabilities[best])
+
+CANDIDATE_LABELS = ['Business', 'Technology', 'Sports', 'Entertainment', 'Politics', 'Science', 'World News']
+# Summaries from concurrent requests are classified together in one batch
+MAX_BATCH_SIZE = 8
+MAX_BATCH_WAIT_SECONDS = 0.05
+
+def _classify_batch(candidate_labels, texts):
+    """
+    Runs one batch of texts through the zero-shot classifier.
+    """
+    results = classifier(texts, list(candidate_labels), batch_size=len(texts))
+    # The pipeline returns a bare dict (not a list) for a single input
+    if isinstance(results, dict):
+        results = [results]
+    return results
+
+classifier_scheduler = BatchScheduler(
+    _classify_batch,
+    max_batch_size=MAX_BATCH_SIZE,
+    max_wait=MAX_BATCH_WAIT_SECONDS,
+    name="classifier-scheduler"
+)
 
 def categorize_text(text):
     """
-    Categorizes a given text using a fast, zero-shot classification model.
+    Categorizes a given text with the trained TF-IDF model, and falls back
+    to the zero-shot classification model when it isn't confident.
     """
     # We will categorize the summary, so the text will already be short
-    candidate_labels = ['Business', 'Technology', 'Sports', 'Entertainment', 'Politics', 'Science', 'World News']
-    
     try:
-        result = classifier(text, candidate_labels)
+        category, confidence = _fast_categorize(text)
+        if category and confidence >= CONFIDENCE_THRESHOLD:
+            print(f"Article categorized as: {category} (TF-IDF, {confidence:.2f})")
+            return category
+    except Exception as e:
+        # The zero-shot model can still categorize it
+        print(f"An error occurred in the fast categorizer: {e}")
+
+    try:
+        load_classifier()
+        result = classifier_scheduler.submit(text, key=tuple(CANDIDATE_LABELS)).result(timeout=RESULT_TIMEOUT_SECONDS)
         
         top_category = result['labels'][0]
         print(f"Article categorized as: {top_category}")
@@ -1,99 +1,335 @@
 # summarizer/model.py
 
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM, pipeline
+import os
+import threading
+from summarizer.batcher import BatchScheduler, RESULT_TIMEOUT_SECONDS
+from summarizer.backends import INFERENCE_BACKEND, BACKEND_ONNX, load_seq2seq_model, onnx_model_dir
 
-# --- 1. Define the path and load the model ---
+# --- 1. Define the path; the model itself is loaded lazily ---
 MODEL_PATH = "./my-fine-tuned-model"
-print("Loading fine-tuned summarization model and tokenizer...")
-
-try:
-    # We need to load the tokenizer and model separately for chunking
-    tokenizer = AutoTokenizer.from_pretrained(MODEL_PATH)
-    model = AutoModelForSeq2SeqLM.from_pretrained(MODEL_PATH)
-    print("Fine-tuned model loaded successfully.")
-except Exception as e:
-    print(f"Error loading fine-tuned model: {e}")
-    # Fallback in case something is wrong
-    tokenizer = AutoTokenizer.from_pretrained("t5-small")
-    model = AutoModelForSeq2SeqLM.from_pretrained("t5-small")
-
-# Create the pipeline, which we'll use to summarize each chunk
-summarizer_pipeline = pipeline(
-    "summarization", 
-    model=model, 
-    tokenizer=tokenizer
-)
+FALLBACK_MODEL = "t5-small"
+
+def _checkpoint_id(path):
+    """
+    Identifies a model and the backend it runs on. Local checkpoints also
+    get the time their files last changed, so retraining (or re-exporting
+    to ONNX) gives a new id and old cached summaries aren't served.
+    """
+    model_id = f"{path}@{INFERENCE_BACKEND}"
+    directories = [path]
+    if INFERENCE_BACKEND == BACKEND_ONNX:
+        directories.append(onnx_model_dir(path))
+    mtimes = [
+        entry.stat().st_mtime
+        for directory in directories if os.path.isdir(directory)
+        for entry in os.scandir(directory) if entry.is_file()
+    ]
+    if mtimes:
+        model_id += f"-{int(max(mtimes))}"
+    return model_id
+
+# Which model (and inference backend) summaries come from. This is our best
+# guess until the model is loaded, and is corrected if we have to fall back.
+MODEL_ID = _checkpoint_id(MODEL_PATH if os.path.isdir(MODEL_PATH) else FALLBACK_MODEL)
+
+# These are filled in by load_model() on first use (or by a warmup thread)
+tokenizer = None
+model = None
+_load_lock = threading.Lock()
+
+# Token-level helpers, also filled in by load_model()
+# The "summarize: " prefix as token IDs, so we never re-tokenize it
+PREFIX_IDS = []
+# IDs of tokens that end a sentence (".", "!", "?", '."', ...)
+SENTENCE_END_IDS = frozenset()
+# Generation settings the summarization pipeline used to pick up from the
+# model config (beam search, length penalty, no-repeat n-grams)
+GENERATION_DEFAULTS = {}
+
+def load_model():
+    """
+    Loads the fine-tuned model and tokenizer exactly once.
+    Safe to call from many threads; later calls return immediately.
+    """
+    global tokenizer, model, MODEL_ID, PREFIX_IDS, SENTENCE_END_IDS, GENERATION_DEFAULTS
+    if model is not None:
+        return
+
+    with _load_lock:
+        if model is not None:
+            return
+
+        # Importing transformers (and torch) is slow, so we only do it here
+        from transformers import AutoTokenizer
+
+        print(f"Loading fine-tuned summarization model and tokenizer ({INFERENCE_BACKEND} backend)...")
+        try:
+            # We need to load the tokenizer and model separately for chunking
+            loaded_tokenizer = AutoTokenizer.from_pretrained(MODEL_PATH)
+            loaded_model = load_seq2seq_model(MODEL_PATH)
+            MODEL_ID = _checkpoint_id(MODEL_PATH)
+            print("Fine-tuned model loaded successfully.")
+        except Exception as e:
+            print(f"Error loading fine-tuned model: {e}")
+            # Fallback in case something is wrong
+            loaded_tokenizer = AutoTokenizer.from_pretrained(FALLBACK_MODEL)
+            loaded_model = load_seq2seq_model(FALLBACK_MODEL)
+            MODEL_ID = _checkpoint_id(FALLBACK_MODEL)
+
+        PREFIX_IDS = loaded_tokenizer("summarize: ", add_special_tokens=False).input_ids
+        SENTENCE_END_IDS = frozenset(
+            token_id for token, token_id in loaded_tokenizer.get_vocab().items()
+            if token.rstrip('"\'”’)').endswith(('.', '!', '?'))
+        )
+        task_params = (loaded_model.config.task_specific_params or {}).get('summarization', {})
+        GENERATION_DEFAULTS = {
+            key: value for key, value in task_params.items()
+            if key in ('num_beams', 'length_penalty', 'no_repeat_ngram_size', 'early_stopping')
+        }
+
+        tokenizer = loaded_tokenizer
+        # Set last: other threads treat a non-None model as "fully loaded"
+        model = loaded_model
+
+def is_model_loaded():
+    return model is not None
 
 # --- 2. Define Chunking Parameters ---
 # The t5-small model has a 512 token limit. We'll use 450 to be safe.
 MAX_TOKENS_PER_CHUNK = 450
 # We overlap chunks to ensure no context is lost between them
 OVERLAP_TOKENS = 50
+# A chunk may end up to this many tokens early so it ends on a full sentence
+SENTENCE_SNAP_WINDOW = 100
+# How many chunks go through the model together. Chunks from
+# concurrent requests share a batch, padded to the longest one.
+MAP_BATCH_SIZE = 8
+# How long the scheduler waits for more chunks before running a batch
+MAX_BATCH_WAIT_SECONDS = 0.05
+
+def _model_input(token_ids):
+    # "summarize: " + text + </s>, all as token IDs
+    return PREFIX_IDS + list(token_ids) + [tokenizer.eos_token_id]
+
+def _summarize_batch(generation_settings, batch_of_token_ids):
+    """
+    Runs one padded batch of token-ID inputs through model.generate and
+    returns each output as token IDs, with special tokens removed.
+    All inputs in a batch share the same (min_length, max_new_tokens).
+    """
+    import torch
+
+    min_length, max_new_tokens = generation_settings
+    inputs = [_model_input(token_ids) for token_ids in batch_of_token_ids]
+    longest = max(len(ids) for ids in inputs)
+    pad_id = tokenizer.pad_token_id
+    input_ids = torch.tensor([ids + [pad_id] * (longest - len(ids)) for ids in inputs])
+    attention_mask = torch.tensor([[1] * len(ids) + [0] * (longest - len(ids)) for ids in inputs])
+
+    with torch.no_grad():
+        outputs = model.generate(
+            input_ids=input_ids,
+            attention_mask=attention_mask,
+            min_length=min_length,
+            max_new_tokens=max_new_tokens,
+            do_sample=False,
+            **GENERATION_DEFAULTS
+        )
+
+    special_ids = set(tokenizer.all_special_ids)
+    return [[token_id for token_id in output.tolist() if token_id not in special_ids] for output in outputs]
+
+# --- 3. Cross-request batching ---
+# Every summarize_text call (from any request thread) sends its generate
+# work through this scheduler, so concurrent requests are micro-batched
+# instead of fighting over the CPU with separate generate calls.
+summary_scheduler = BatchScheduler(
+    _summarize_batch,
+    max_batch_size=MAP_BATCH_SIZE,
+    max_wait=MAX_BATCH_WAIT_SECONDS,
+    name="summarizer-scheduler"
+)
+
+def _fits_in_one_chunk(token_ids):
+    return len(_model_input(token_ids)) <= MAX_TOKENS_PER_CHUNK
+
+def _snap_to_sentence_end(token_ids, start, end):
+    """
+    Moves `end` back to just after the last sentence-ending token in the
+    snap window, if there is one, so a chunk doesn't stop mid-sentence.
+    """
+    for i in range(end - 1, max(start, end - SENTENCE_SNAP_WINDOW) - 1, -1):
+        if token_ids[i] in SENTENCE_END_IDS:
+            return i + 1
+    return end
+
+def _snap_to_sentence_start(token_ids, start, end):
+    """
+    Moves `start` forward to the first sentence start before `end`, so the
+    overlap with the previous chunk begins on a whole sentence.
+    """
+    for i in range(start, end):
+        if token_ids[i - 1] in SENTENCE_END_IDS:
+            return i
+    return start
+
+def _split_into_chunks(token_ids):
+    """
+    Splits token IDs into overlapping chunks that each fit the model.
+    Chunks end on sentence boundaries where possible, and each chunk's
+    overlap with the previous one starts at a sentence boundary too.
+    """
+    # Room left for the text once the prefix and </s> are added
+    budget = MAX_TOKENS_PER_CHUNK - len(PREFIX_IDS) - 1
+    num_tokens = len(token_ids)
+
+    chunks = []
+    start = 0
+    while start < num_tokens:
+        end = min(start + budget, num_tokens)
+        if end < num_tokens:
+            # Never snap back into the overlap, so every chunk moves us forward
+            end = _snap_to_sentence_end(token_ids, start + OVERLAP_TOKENS + 1, end)
+        chunks.append(token_ids[start:end])
+        if end >= num_tokens:
+            break
+        # Step back by the overlap, then forward to the nearest sentence start
+        start = _snap_to_sentence_start(token_ids, end - OVERLAP_TOKENS, end)
+
+    print(f"--- Split text into {len(chunks)} overlapping chunks. ---")
+    return chunks
+
+def _summarize_ids(token_ids):
+    """
+    The recursive Map-Reduce, entirely on token IDs.
+    Returns the summary as token IDs.
+    """
+    # 1. BASE CASE: If text is short enough, summarize it directly.
+    if _fits_in_one_chunk(token_ids):
+        print(f"--- Text is short ({len(token_ids)} tokens). Performing final summary. ---")
+        # Generate between 40 and 150 new tokens
+        return summary_scheduler.submit(token_ids, key=(40, 150)).result(timeout=RESULT_TIMEOUT_SECONDS)
+
+    # 2. RECURSIVE CASE: Text is too long. Chunk it.
+    print(f"--- Text is long ({len(token_ids)} tokens). Starting recursive chunking. ---")
+    chunks = _split_into_chunks(token_ids)
+
+    # 3. Summarize the chunks in padded batches (the "Map" step)
+    print(f"Summarizing {len(chunks)} chunks in batches of up to {MAP_BATCH_SIZE}...")
+    # Shorter min/max lengths for chunks
+    mini_summaries = summary_scheduler.run(chunks, key=(20, 75))
+
+    # 4. Combine all mini-summaries (the "Combine" step)
+    # Generated pieces start with a word-boundary token, so concatenating
+    # the IDs is the same as joining the texts with spaces.
+    combined_ids = [token_id for mini_summary in mini_summaries for token_id in mini_summary]
+
+    # 5. Summarize the combined text (the "Reduce" step)
+    print("--- Combining mini-summaries and performing final summary... ---")
+    return _summarize_ids(combined_ids) # This is the recursive call
 
 def summarize_text(text_to_summarize):
     """
     Summarizes text of ANY length by recursively
     chunking and summarizing (Map-Reduce).
+    The text is tokenized once; chunking, batching and the reduce step
+    all work on token IDs, and only the final summary is decoded.
     """
-    
-    # 1. Tokenize the whole text to see how long it is
-    # We add the prefix here to get an accurate token count
-    prefixed_text = "summarize: " + text_to_summarize
-    
-    # We use the tokenizer directly to count tokens
-    tokens = tokenizer(prefixed_text, return_tensors="pt")
-    num_tokens = tokens.input_ids.shape[1]
-    
-    # 2. BASE CASE: If text is short enough, summarize it directly.
-    if num_tokens <= MAX_TOKENS_PER_CHUNK:
-        print(f"--- Text is short ({num_tokens} tokens). Performing final summary. ---")
-        summary_result = summarizer_pipeline(
-            prefixed_text, 
-            min_length=40, 
-            max_new_tokens=150, # Generate up to 150 new tokens
-            do_sample=False
-        )
-        return summary_result[0]['summary_text']
-        
-    # 3. RECURSIVE CASE: Text is too long. Chunk it.
-    print(f"--- Text is long ({num_tokens} tokens). Starting recursive chunking. ---")
-    
-    # Get all token IDs from the input
-    token_ids = tokens.input_ids[0]
-    
-    chunks_of_token_ids = []
-    # We "stride" over the text, creating chunks
-    stride = MAX_TOKENS_PER_CHUNK - OVERLAP_TOKENS
-    
-    for i in range(0, num_tokens, stride):
-        # Get a chunk of token IDs
-        chunk = token_ids[i : i + MAX_TOKENS_PER_CHUNK]
-        chunks_of_token_ids.append(chunk)
-        
-    # 4. Convert token chunks back into text strings
-    text_chunks = [tokenizer.decode(chunk, skip_special_tokens=True) for chunk in chunks_of_token_ids]
-    
-    print(f"--- Split text into {len(text_chunks)} overlapping chunks. ---")
-    
-    # 5. Summarize each chunk (the "Map" step)
-    list_of_mini_summaries = []
-    for i, chunk in enumerate(text_chunks):
-        print(f"Summarizing chunk {i+1}/{len(text_chunks)}...")
-        # We must add the prefix back to each chunk
-        chunk_with_prefix = "summarize: " + chunk
-        
-        chunk_summary = summarizer_pipeline(
-            chunk_with_prefix,
-            min_length=20,     # Shorter min_length for chunks
-            max_new_tokens=75, # Shorter max_length for chunks
-            do_sample=False
-        )
-        list_of_mini_summaries.append(chunk_summary[0]['summary_text'])
-        
-    # 6. Combine all mini-summaries (the "Combine" step)
-    combined_summaries = " ".join(list_of_mini_summaries)
-    
-    # 7. Summarize the combined text (the "Reduce" step)
-    # We call the function *itself* on the new, shorter text.
-    print("--- Combining mini-summaries and performing final summary... ---")
-    return summarize_text(combined_summaries) # This is the recursive call
\ No newline at end of file
+    load_model()
+    token_ids = tokenizer(text_to_summarize, add_special_tokens=False).input_ids
+    summary_ids = _summarize_ids(token_ids)
+    return tokenizer.decode(summary_ids, skip_special_tokens=True).strip()
+
+# --- 4. Streaming ---
+# Streamed summaries are decoded greedily, so they are a different (and
+# slightly weaker) output than summarize_text's; cache them separately
+STREAM_DECODING_ID = "greedy-ngram-blocked"
+# Streaming rules out beam search, but these generation defaults work
+# with greedy decoding too (without them, T5 repeats itself)
+STREAM_GENERATION_SETTINGS = ('no_repeat_ngram_size',)
+
+def _stream_final_summary(token_ids):
+    """
+    Generates the final summary and yields its text as it is produced.
+    Streaming needs greedy decoding, so this pass doesn't use beam search,
+    but it keeps the model's other generation defaults that greedy
+    decoding supports. Raises RuntimeError if generation fails or stalls.
+    """
+    import queue
+    import torch
+    from transformers import TextIteratorStreamer
+
+    # Without a timeout, a generate call that dies would leave us waiting forever
+    streamer = TextIteratorStreamer(
+        tokenizer, skip_prompt=True, skip_special_tokens=True, timeout=RESULT_TIMEOUT_SECONDS
+    )
+    errors = []
+
+    def generate():
+        try:
+            with torch.no_grad():
+                model.generate(
+                    input_ids=torch.tensor([_model_input(token_ids)]),
+                    min_length=40,
+                    max_new_tokens=150,
+                    do_sample=False,
+                    num_beams=1,
+                    streamer=streamer,
+                    **{key: value for key, value in GENERATION_DEFAULTS.items() if key in STREAM_GENERATION_SETTINGS}
+                )
+        except Exception as e:
+            errors.append(e)
+            # Unblocks the reader below
+            streamer.end()
+
+    generation = threading.Thread(target=generate, daemon=True)
+    generation.start()
+
+    parts = []
+    try:
+        for piece in streamer:
+            if piece:
+                parts.append(piece)
+                yield {'event': 'token', 'text': piece}
+    except queue.Empty:
+        raise RuntimeError(f"The summary wasn't generated within {RESULT_TIMEOUT_SECONDS} seconds.") from None
+    generation.join()
+    if errors:
+        raise RuntimeError(f"Generating the summary failed: {errors[0]}") from errors[0]
+
+    yield {'event': 'summary', 'summary': "".join(parts).strip()}
+
+def _summarize_ids_stream(token_ids):
+    if _fits_in_one_chunk(token_ids):
+        print(f"--- Text is short ({len(token_ids)} tokens). Streaming final summary. ---")
+        yield from _stream_final_summary(token_ids)
+        return
+
+    print(f"--- Text is long ({len(token_ids)} tokens). Starting recursive chunking. ---")
+    chunks = _split_into_chunks(token_ids)
+
+    # Queue every chunk at once so they still share batches,
+    # then report each one as its result comes back
+    futures = [summary_scheduler.submit(chunk, key=(20, 75)) for chunk in chunks]
+    mini_summaries = []
+    for i, future in enumerate(futures):
+        mini_summaries.append(future.result(timeout=RESULT_TIMEOUT_SECONDS))
+        yield {
+            'event': 'progress',
+            'chunk': i + 1,
+            'total': len(futures),
+            'mini_summary': tokenizer.decode(mini_summaries[-1], skip_special_tokens=True).strip()
+        }
+
+    combined_ids = [token_id for mini_summary in mini_summaries for token_id in mini_summary]
+    yield from _summarize_ids_stream(combined_ids)
+
+def summarize_text_stream(text_to_summarize):
+    """
+    The same Map-Reduce as summarize_text, but as a generator of events:
+    'progress' after each chunk's mini-summary, 'token' for each piece
+    of the final summary, and finally 'summary' with the whole text.
+    """
+    load_model()
+    token_ids = tokenizer(text_to_summarize, add_special_tokens=False).input_ids
+    yield from _summarize_ids_stream(token_ids)
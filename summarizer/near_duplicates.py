@@ -0,0 +1,110 @@
+# summarizer/near_duplicates.py
+
+import hashlib
+import re
+import numpy as np
+
+# --- MinHash signatures ---
+# The same wire story turns up in several feeds with small wording changes.
+# MinHash estimates the Jaccard similarity of two texts' word shingles from
+# fixed-size signatures, and LSH banding finds likely matches without
+# comparing against every stored article.
+NUM_PERMUTATIONS = 128
+# 16 bands of 8 rows: a pair with similarity s shares a band with
+# probability 1 - (1 - s**8) ** 16, about 95% at the 0.8 article
+# threshold, 99.5% at 0.85, but only about 62% at 0.7
+NUM_BANDS = 16
+ROWS_PER_BAND = NUM_PERMUTATIONS // NUM_BANDS
+# Articles are compared on 3-word shingles. Headlines are compared on
+# 2-word shingles without stopwords: with single words, "Sensex falls 500
+# points" and "Sensex rises 500 points" look like the same story
+ARTICLE_SHINGLE_SIZE = 3
+HEADLINE_SHINGLE_SIZE = 2
+# Estimated similarity above which two texts count as the same story
+ARTICLE_SIMILARITY_THRESHOLD = 0.8
+HEADLINE_SIMILARITY_THRESHOLD = 0.8
+
+# Dropped from headlines before shingling, so two headlines don't match
+# on "to ... the ... in" alone
+STOPWORDS = frozenset("""
+    a an and are as at be by for from has have in into is it its of on or
+    over says that the this to was were will with after amid about up out
+""".split())
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+# Fixed seed: stored signatures must stay comparable across restarts
+_rng = np.random.default_rng(2024)
+_PERM_A = _rng.integers(1, 1 << 31, size=NUM_PERMUTATIONS, dtype=np.uint64)
+_PERM_B = _rng.integers(0, 1 << 31, size=NUM_PERMUTATIONS, dtype=np.uint64)
+
+def _shingles(text, shingle_size, drop_stopwords=False):
+    words = re.findall(r"\w+", text.lower())
+    if drop_stopwords:
+        words = [word for word in words if word not in STOPWORDS]
+    if len(words) < shingle_size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + shingle_size]) for i in range(len(words) - shingle_size + 1)}
+
+def minhash_signature(text, shingle_size=ARTICLE_SHINGLE_SIZE, drop_stopwords=False):
+    """
+    Returns the MinHash signature of `text` as a uint32 array,
+    or None if the text has no words.
+    """
+    shingles = _shingles(text, shingle_size, drop_stopwords)
+    if not shingles:
+        return None
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=4).digest(), "little") for shingle in shingles),
+        dtype=np.uint64,
+        count=len(shingles)
+    )
+    # One row per permutation: (a * x + b) mod p, then the minimum over shingles
+    permuted = (np.outer(_PERM_A, hashes) + _PERM_B[:, None]) % _MERSENNE_PRIME
+    return (permuted & _MAX_HASH).min(axis=1).astype(np.uint32)
+
+def signature_bands(signature):
+    """
+    The LSH band keys of a signature, as signed 64-bit ints (so SQLite
+    can index them). Similar texts share at least one band key.
+    """
+    return [
+        int.from_bytes(
+            hashlib.blake2b(bytes([band]) + signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND].tobytes(), digest_size=8).digest(),
+            "little",
+            signed=True
+        )
+        for band in range(NUM_BANDS)
+    ]
+
+def estimate_similarity(signature, other_signature):
+    return float(np.mean(signature == other_signature))
+
+def signature_to_bytes(signature):
+    return signature.tobytes()
+
+def signature_from_bytes(data):
+    return np.frombuffer(data, dtype=np.uint32)
+
+def cluster_near_duplicates(texts, threshold=HEADLINE_SIMILARITY_THRESHOLD, shingle_size=HEADLINE_SHINGLE_SIZE):
+    """
+    Groups near-duplicate texts, such as the headlines of several feeds.
+    Returns a cluster number for each text: the index of the first text in
+    its cluster. Headline lists are short, so this compares every pair of
+    signatures (in one numpy pass) instead of banding.
+    """
+    signatures = [minhash_signature(text, shingle_size, drop_stopwords=True) for text in texts]
+    clusters = list(range(len(texts)))
+    present = [i for i, signature in enumerate(signatures) if signature is not None]
+    if len(present) < 2:
+        return clusters
+
+    matrix = np.stack([signatures[i] for i in present])
+    similarity = (matrix[:, None, :] == matrix[None, :, :]).mean(axis=2)
+    for row, i in enumerate(present):
+        for column in range(row):
+            j = present[column]
+            if clusters[j] == j and similarity[row, column] >= threshold:
+                clusters[i] = j
+                break
+    return clusters
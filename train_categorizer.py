@@ -0,0 +1,44 @@
+import joblib
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import classification_report
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import make_pipeline
+
+from summarizer.categorizer import FAST_MODEL_PATH
+from prepare_data import DATA_FILE, read_cleaned_data
+
+# --- 1. Configuration ---
+# The same seed and held-out fraction as train_summarizer.py, but a
+# different split: this one is stratified by category, so the held-out
+# rows are not the ones train_summarizer.py holds out
+SPLIT_SEED = 42
+TEST_SIZE = 0.1
+
+# --- 2. Load and Split the Dataset ---
+print("Loading dataset...")
+df = read_cleaned_data(DATA_FILE)
+df = df.dropna()
+train_df, test_df = train_test_split(df, test_size=TEST_SIZE, random_state=SPLIT_SEED, stratify=df['category'])
+
+# At request time we categorize summaries, so we train on
+# both the full articles and their reference summaries
+train_texts = list(train_df['article']) + list(train_df['summary'])
+train_labels = list(train_df['category']) * 2
+print(f"Training examples: {len(train_texts)}")
+
+# --- 3. Train TF-IDF + Logistic Regression ---
+print("Training TF-IDF category model...")
+category_model = make_pipeline(
+    TfidfVectorizer(sublinear_tf=True, ngram_range=(1, 2), min_df=2, stop_words='english'),
+    LogisticRegression(max_iter=1000)
+)
+category_model.fit(train_texts, train_labels)
+
+# --- 4. Evaluate on held-out summaries ---
+print("\n--- Held-out summaries ---")
+print(classification_report(test_df['category'], category_model.predict(test_df['summary'])))
+
+# --- 5. Save the Model ---
+joblib.dump(category_model, FAST_MODEL_PATH)
+print(f"Saved category model to {FAST_MODEL_PATH}")
@@ -1,4 +1,6 @@
-import pandas as pd
+import hashlib
+import multiprocessing
+import os
 from datasets import Dataset
 from transformers import (
     AutoTokenizer,
@@ -8,19 +10,28 @@ from transformers import (
     Seq2SeqTrainer
 )
 
+from prepare_data import DATA_FILE, read_cleaned_data
+
 # --- 1. Configuration ---
 # THE FIX: Using the much smaller and faster t5-small model
 MODEL_CHECKPOINT = "t5-small" 
-DATA_FILE = "bbc_news_cleaned.csv"
 NEW_MODEL_DIR = "./my-fine-tuned-model" 
+# Fixed so export_model.py can score backends on the same held-out split
+SPLIT_SEED = 42
+# Tokenization runs in this many processes. Where worker processes aren't
+# forked (Windows, macOS, and Linux from Python 3.14 on), each one re-runs
+# this whole script, so tokenize in-process there.
+NUM_PROC = (os.cpu_count() or 1) if multiprocessing.get_start_method() == 'fork' else 1
+# Tokenized datasets are saved here and reused by later runs
+TOKENIZED_CACHE_DIR = "./tokenized-cache"
 
 # --- 2. Load and Prepare the Dataset ---
 print("Loading dataset...")
-df = pd.read_csv(DATA_FILE)
+df = read_cleaned_data(DATA_FILE)
 df = df.dropna()
 raw_dataset = Dataset.from_pandas(df)
 
-dataset_split = raw_dataset.train_test_split(test_size=0.1)
+dataset_split = raw_dataset.train_test_split(test_size=0.1, seed=SPLIT_SEED)
 train_dataset = dataset_split['train']
 eval_dataset = dataset_split['test']
 
@@ -42,28 +53,51 @@ def preprocess_function(examples):
     # --- T5 CHANGE: Add prefix to the article ---
     inputs = [prefix + doc for doc in examples['article']]
     
+    # No padding here: the data collator pads each batch to its own longest
+    # example, so short articles don't cost a full 1024 tokens each
     model_inputs = tokenizer(
         inputs, 
         max_length=MAX_INPUT_LENGTH, 
-        truncation=True, 
-        padding="max_length"
+        truncation=True
     )
     
     # Tokenize the summaries (as labels)
-    with tokenizer.as_target_tokenizer():
-        labels = tokenizer(
-            examples['summary'], 
-            max_length=MAX_TARGET_LENGTH, 
-            truncation=True, 
-            padding="max_length"
-        )
+    labels = tokenizer(
+        text_target=examples['summary'], 
+        max_length=MAX_TARGET_LENGTH, 
+        truncation=True
+    )
     
     model_inputs["labels"] = labels["input_ids"]
+    # Lets group_by_length batch similar lengths without re-measuring them
+    model_inputs["length"] = [len(input_ids) for input_ids in model_inputs["input_ids"]]
     return model_inputs
 
-print("Tokenizing datasets... (This may take a moment)")
-tokenized_train_dataset = train_dataset.map(preprocess_function, batched=True)
-tokenized_eval_dataset = eval_dataset.map(preprocess_function, batched=True)
+def tokenized_cache_file(split_name):
+    """
+    Where a split's tokenized dataset is cached. The name changes whenever
+    the data file, the tokenizer or the preprocessing settings do, so a
+    stale cache is never reused.
+    """
+    stat = os.stat(DATA_FILE)
+    settings = f"{DATA_FILE}:{stat.st_size}:{stat.st_mtime_ns}:{MODEL_CHECKPOINT}:{prefix}:{MAX_INPUT_LENGTH}:{MAX_TARGET_LENGTH}:{SPLIT_SEED}"
+    digest = hashlib.sha256(settings.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(TOKENIZED_CACHE_DIR, f"{split_name}-{digest}.arrow")
+
+def tokenize_split(dataset, split_name):
+    return dataset.map(
+        preprocess_function,
+        batched=True,
+        num_proc=NUM_PROC,
+        remove_columns=dataset.column_names,
+        cache_file_name=tokenized_cache_file(split_name),
+        load_from_cache_file=True
+    )
+
+print(f"Tokenizing datasets with {NUM_PROC} processes... (cached after the first run)")
+os.makedirs(TOKENIZED_CACHE_DIR, exist_ok=True)
+tokenized_train_dataset = tokenize_split(train_dataset, "train")
+tokenized_eval_dataset = tokenize_split(eval_dataset, "eval")
 print("Tokenizing complete.")
 
 # --- 5. Load the Pre-trained Model ---
@@ -73,7 +107,9 @@ model = AutoModelForSeq2SeqLM.from_pretrained(MODEL_CHECKPOINT)
 # --- 6. Set Up Training ---
 print("Setting up training arguments...")
 
-data_collator = DataCollatorForSeq2Seq(tokenizer, model=model)
+# Pads each batch to its longest example; label padding is -100,
+# so padded label positions are ignored by the loss
+data_collator = DataCollatorForSeq2Seq(tokenizer, model=model, label_pad_token_id=-100)
 
 training_args = Seq2SeqTrainingArguments(
     output_dir=NEW_MODEL_DIR,
@@ -84,6 +120,9 @@ training_args = Seq2SeqTrainingArguments(
     weight_decay=0.01,
     save_total_limit=3,
     num_train_epochs=3,
+    # Batches articles of similar length together, so there's little to pad
+    group_by_length=True,
+    length_column_name="length",
     predict_with_generate=True,
     fp16=False,
     push_to_hub=False,